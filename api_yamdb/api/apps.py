@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import api.signals  # noqa: F401
+        from api.authentication import check_role_claim_cache
+        from api.cache import check_shared_cache
+
+        if settings.SHARED_CACHE_REQUIRED:
+            check_shared_cache()
+        if settings.JWT_ROLE_CLAIM:
+            check_role_claim_cache()
@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+USER_CACHE_KEY = 'jwt-user:{}'
+REVOKED_USER_KEY = 'jwt-revoked:{}'
+# Поля пользователя, которые передаются в токене при JWT_ROLE_CLAIM = True.
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser')
+# Кэши в памяти процесса и вытесняющие записи при нехватке памяти: отметки
+# revoke_user в них теряются или не видны другим процессам сервера.
+UNSAFE_CLAIM_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+)
+# Кэши, которые удаляют записи сверх OPTIONS['MAX_ENTRIES'] (по умолчанию
+# 300): лимит нужно задать явно, с запасом на всех пользователей.
+CULLING_CLAIM_CACHES = (
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+def get_user_cache():
+    return caches[settings.JWT_USER_CACHE_ALIAS]
+
+
+def invalidate_cached_user(user_id):
+    """Удаляет пользователя из кэша аутентификации."""
+    get_user_cache().delete(USER_CACHE_KEY.format(user_id))
+
+
+def revoke_user(user_id):
+    """
+    Отзывает токены пользователя, выпущенные до текущей секунды: после
+    удаления, деактивации или смены прав их роль проверяется по БД.
+    Отметка хранится не дольше срока жизни access-токена.
+    """
+    cache = get_user_cache()
+    cache.delete(USER_CACHE_KEY.format(user_id))
+    cache.set(
+        REVOKED_USER_KEY.format(user_id),
+        int(time.time()),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+    )
+
+
+def check_role_claim_cache():
+    """
+    Проверяет, что кэш JWT_USER_CACHE_ALIAS подходит для JWT_ROLE_CLAIM:
+    общий для процессов сервера и не теряет отметки revoke_user.
+    """
+    config = settings.CACHES[settings.JWT_USER_CACHE_ALIAS]
+    backend = config['BACKEND']
+    if backend in UNSAFE_CLAIM_CACHES or (
+        backend in CULLING_CLAIM_CACHES
+        and 'MAX_ENTRIES' not in config.get('OPTIONS', {})
+    ):
+        raise ImproperlyConfigured(
+            f'JWT_ROLE_CLAIM требует общего кэша без вытеснения записей '
+            f'(для {", ".join(CULLING_CLAIM_CACHES)} - с явным '
+            f'OPTIONS["MAX_ENTRIES"]), а кэш '
+            f'{settings.JWT_USER_CACHE_ALIAS!r} использует {backend}.'
+        )
+
+
+def get_access_token(user):
+    """
+    Выпускает access-токен. При включённой настройке JWT_ROLE_CLAIM
+    в токен добавляются роль и признаки персонала.
+    """
+    token = AccessToken.for_user(user)
+    if settings.JWT_ROLE_CLAIM:
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая берёт пользователя из кэша вместо запроса
+    к БД на каждый запрос.
+
+    Если настройка JWT_ROLE_CLAIM включена и токен содержит роль,
+    пользователь собирается прямо из токена: остальные поля загружаются
+    из БД только при обращении к ним. При удалении, деактивации или
+    смене прав пользователя его токены отзываются (revoke_user): токены,
+    выпущенные раньше, проверяются по БД, как без JWT_ROLE_CLAIM.
+    Отметки живут в кэше JWT_USER_CACHE_ALIAS, поэтому режим включается
+    только с общим кэшем без вытеснения (check_role_claim_cache).
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cache = get_user_cache()
+        if settings.JWT_ROLE_CLAIM and all(
+            field in validated_token for field in CLAIM_FIELDS
+        ):
+            check_role_claim_cache()
+            revoked = cache.get(REVOKED_USER_KEY.format(user_id))
+            if revoked is None or validated_token.get('iat', 0) > revoked:
+                return self.get_user_from_claims(validated_token)
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        return user
+
+    def get_user_from_claims(self, validated_token):
+        """Собирает пользователя из токена с отложенной загрузкой полей."""
+        field_names = (api_settings.USER_ID_FIELD,) + CLAIM_FIELDS
+        values = [validated_token[api_settings.USER_ID_CLAIM]] + [
+            validated_token[field] for field in CLAIM_FIELDS
+        ]
+        return self.user_model.from_db(DEFAULT_DB_ALIAS, field_names, values)
@@ -0,0 +1,200 @@
+"""
+Автодополнение названий произведений, жанров и категорий по префиксу.
+
+Индекс хранится в памяти процесса: для каждого объекта в отсортированный
+список попадают хвосты названия, начинающиеся с каждого слова, поэтому
+поиск префикса - это bisect и просмотр соседних ключей. Записи через API
+обновляют индекс точечно (см. api.signals); массовые загрузки и записи в
+других процессах меняют номер версии 'autocomplete' в кэше
+RESPONSE_CACHE_ALIAS, и индекс перестраивается при следующем запросе.
+
+Другие процессы видят смену версии, только если этот кэш общий: это
+обязательно при SHARED_CACHE_REQUIRED (см. api.cache.check_shared_cache).
+С кэшем в памяти процесса (по умолчанию в DEBUG) версия и индекс у
+каждого процесса свои, и после команд импорта сервер нужно перезапустить.
+"""
+import re
+from bisect import bisect_left, insort
+from heapq import nsmallest
+from threading import RLock
+
+from api.cache import bump_version, get_version
+from reviews.models import Category, Genre, Title
+
+WORD = re.compile(r'\w+')
+TITLES = 'titles'
+GENRES = 'genres'
+CATEGORIES = 'categories'
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def iter_keys(name):
+    """Хвосты названия, начинающиеся с каждого слова."""
+    name = normalize(name)
+    return {name[word.start():] for word in WORD.finditer(name)}
+
+
+def title_order(item):
+    """Сначала произведения с высоким рейтингом, без рейтинга - в конце."""
+    rating = item['rating']
+    return rating is None, -(rating or 0), item['name']
+
+
+def name_order(item):
+    return item['name']
+
+
+class PrefixIndex:
+    """
+    Отсортированный список пар (ключ, id) для поиска префикса и список
+    объектов в порядке выдачи для коротких префиксов, под которые
+    подходит большая часть индекса.
+    """
+
+    def __init__(self, order, items=()):
+        self.order = order
+        self.items = dict(items)
+        self.item_keys = {
+            obj_id: iter_keys(item['name'])
+            for obj_id, item in self.items.items()
+        }
+        self.keys = sorted(
+            (key, obj_id)
+            for obj_id, keys in self.item_keys.items()
+            for key in keys
+        )
+        self.ranked = sorted(
+            (order(item), obj_id) for obj_id, item in self.items.items()
+        )
+
+    def add(self, obj_id, item):
+        self.remove(obj_id)
+        self.items[obj_id] = item
+        self.item_keys[obj_id] = iter_keys(item['name'])
+        for key in self.item_keys[obj_id]:
+            insort(self.keys, (key, obj_id))
+        insort(self.ranked, (self.order(item), obj_id))
+
+    def remove(self, obj_id):
+        item = self.items.pop(obj_id, None)
+        if item is None:
+            return
+        for key in self.item_keys.pop(obj_id):
+            del self.keys[bisect_left(self.keys, (key, obj_id))]
+        del self.ranked[bisect_left(self.ranked, (self.order(item), obj_id))]
+
+    def update(self, obj_id, **fields):
+        item = self.items.get(obj_id)
+        if item is not None:
+            self.add(obj_id, {**item, **fields})
+
+    def find(self, prefix, limit):
+        """
+        Первые limit объектов в порядке выдачи, у которых какое-либо слово
+        названия начинается с prefix.
+        """
+        start = bisect_left(self.keys, (prefix,))
+        stop = bisect_left(self.keys, (prefix + chr(0x10FFFF),))
+        matches = stop - start
+        if matches ** 2 > limit * len(self.items):
+            # Совпадений много: быстрее пройти объекты в порядке выдачи.
+            found = []
+            for _, obj_id in self.ranked:
+                keys = self.item_keys[obj_id]
+                if any(key.startswith(prefix) for key in keys):
+                    found.append(self.items[obj_id])
+                    if len(found) == limit:
+                        break
+            return found
+        found = {obj_id for _, obj_id in self.keys[start:stop]}
+        return [
+            self.items[obj_id] for obj_id in nsmallest(
+                limit,
+                found,
+                key=lambda obj_id: (self.order(self.items[obj_id]), obj_id),
+            )
+        ]
+
+
+class AutocompleteIndex:
+    """Индексы произведений, жанров и категорий с номером версии."""
+
+    def __init__(self):
+        self.lock = RLock()
+        self.version = None
+        self.indexes = {}
+
+    def build(self, version):
+        titles = Title.objects.values_list('id', 'name', 'rating')
+        genres = Genre.objects.values_list('id', 'name', 'slug')
+        categories = Category.objects.values_list('id', 'name', 'slug')
+        indexes = {
+            TITLES: PrefixIndex(
+                title_order,
+                [
+                    (obj_id, {'id': obj_id, 'name': name, 'rating': rating})
+                    for obj_id, name, rating in titles
+                ],
+            ),
+            GENRES: PrefixIndex(
+                name_order,
+                [
+                    (obj_id, {'name': name, 'slug': slug})
+                    for obj_id, name, slug in genres
+                ],
+            ),
+            CATEGORIES: PrefixIndex(
+                name_order,
+                [
+                    (obj_id, {'name': name, 'slug': slug})
+                    for obj_id, name, slug in categories
+                ],
+            ),
+        }
+        with self.lock:
+            self.indexes = indexes
+            self.version = version
+
+    def change(self, method, kind, obj_id, *args, **kwargs):
+        """
+        Точечно меняет индекс после фиксации записи. Если версию в
+        промежутке сменил другой процесс, индекс помечается устаревшим.
+        """
+        version = bump_version('autocomplete')
+        with self.lock:
+            if self.version is None or version != self.version + 1:
+                self.version = None
+                return
+            getattr(self.indexes[kind], method)(obj_id, *args, **kwargs)
+            self.version = version
+
+    def search(self, query, limit, kinds=(TITLES, GENRES, CATEGORIES)):
+        version = get_version('autocomplete')
+        if version != self.version:
+            self.build(version)
+        prefix = normalize(query.strip())
+        result = {}
+        with self.lock:
+            for kind in kinds:
+                result[kind] = [
+                    dict(item)
+                    for item in self.indexes[kind].find(prefix, limit)
+                ]
+        for item in result.get(TITLES, ()):
+            if item['rating'] is not None:
+                item['rating'] = int(item['rating'])
+        return result
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def invalidate_autocomplete():
+    """
+    Помечает индексы устаревшими после массовых записей: во всех процессах
+    при общем кэше, иначе только в текущем.
+    """
+    bump_version('autocomplete')
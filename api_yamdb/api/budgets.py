@@ -0,0 +1,49 @@
+"""
+Бюджеты SQL-запросов маршрутов API.
+
+Представление объявляет наибольшее допустимое число SQL-запросов на
+запрос в атрибуте query_budgets: ключ - действие ViewSet (list,
+retrieve, create, partial_update, destroy, дополнительные действия) или
+HTTP-метод в нижнем регистре для APIView. В бюджет входит запрос
+пользователя при аутентификации с пустым кэшем.
+"""
+from django.conf import settings
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос выполнил больше SQL-запросов, чем позволяет бюджет."""
+
+
+def get_view_budgets(view_class):
+    return getattr(view_class, 'query_budgets', None) or {}
+
+
+def get_query_budget(request):
+    """Бюджет маршрута запроса или None, если он не объявлен."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    method = request.method.lower()
+    if method == 'head':
+        method = 'get'
+    actions = getattr(match.func, 'actions', None) or {}
+    return get_view_budgets(getattr(match.func, 'cls', None)).get(
+        actions.get(method, method),
+    )
+
+
+def check_query_budget(request, query_count):
+    """
+    Сообщение о превышении бюджета или None. При QUERY_BUDGET_ACTION =
+    'raise' превышение вызывает QueryBudgetExceeded.
+    """
+    budget = get_query_budget(request)
+    if budget is None or query_count <= budget:
+        return None
+    message = (
+        f'{request.resolver_match.view_name} {request.method}: '
+        f'{query_count} SQL-запросов при бюджете {budget}'
+    )
+    if settings.QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(message)
+    return message
@@ -0,0 +1,167 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+CATALOG_RESPONSE_KEY = 'catalog:{version}:{digest}'
+VERSION_KEY = 'version:{}'
+# Кэши в памяти процесса: версии в них не видны другим процессам сервера.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def check_shared_cache():
+    """
+    Проверяет, что кэш RESPONSE_CACHE_ALIAS общий для процессов сервера:
+    иначе смена версии в одном процессе не видна остальным, и они отдают
+    304 и индекс автодополнения по устаревшим версиям.
+    """
+    alias = settings.RESPONSE_CACHE_ALIAS
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f'SHARED_CACHE_REQUIRED: кэш {alias!r} для версий ETag и '
+            f'автодополнения должен быть общим для процессов сервера, а '
+            f'не {backend}.'
+        )
+
+
+def new_version():
+    """Номер версии, не совпадающий с версиями до вытеснения из кэша."""
+    return int(time.time() * 1000)
+
+
+def get_version(*parts):
+    """Возвращает номер версии ресурса, например ('reviews', title_id)."""
+    return get_response_cache().get_or_set(
+        VERSION_KEY.format(':'.join(map(str, parts))), new_version, None,
+    )
+
+
+def bump_version(*parts):
+    """Меняет номер версии ресурса и возвращает новый номер."""
+    cache = get_response_cache()
+    key = VERSION_KEY.format(':'.join(map(str, parts)))
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = new_version()
+        cache.set(key, version, None)
+        return version
+
+
+def invalidate_catalog():
+    """
+    Сбрасывает закэшированные ответы каталога сменой версии. Старые записи
+    остаются в кэше, но больше не читаются и вытесняются по таймауту.
+    """
+    bump_version('catalog')
+
+
+def get_request_digest(request):
+    """
+    Ключ запроса: схема, хост и путь - ответ содержит абсолютные ссылки
+    пагинации - и отсортированные параметры строки запроса.
+    """
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    return md5(
+        f'{request.build_absolute_uri(request.path)}?{query}'.encode()
+    ).hexdigest()
+
+
+class CachedListMixin:
+    """
+    Кэширует ответ на GET-запрос списка для анонимных пользователей.
+
+    Кэш сбрасывается при изменении произведений, жанров, категорий и
+    отзывов (см. api.signals).
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache = get_response_cache()
+        key = CATALOG_RESPONSE_KEY.format(
+            version=get_version('catalog'),
+            digest=get_request_digest(request),
+        )
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag к ответам list/retrieve и отвечает 304 без выборки и
+    сериализации объектов, если клиент прислал актуальный If-None-Match.
+
+    Представление определяет get_etag_parts(): дешёвый слепок состояния
+    ресурса (счётчики, максимальные id/даты, номера версий) или None,
+    если для действия условные запросы не поддерживаются. Номера версий
+    хранятся в кэше RESPONSE_CACHE_ALIAS, общем для процессов сервера
+    (см. check_shared_cache).
+    """
+
+    def get_etag_parts(self):
+        return None
+
+    def get_kwarg_id(self, name):
+        """
+        id из параметра маршрута или None, если он не число: тогда ETag не
+        считается, а 404 возвращает обычная обработка запроса.
+        """
+        try:
+            return int(self.kwargs.get(name))
+        except (TypeError, ValueError):
+            return None
+
+    def get_etag(self, request):
+        parts = self.get_etag_parts()
+        if parts is None:
+            return None
+        digest = md5(repr((
+            parts,
+            get_request_digest(request),
+            request.accepted_renderer.format,
+        )).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is not None:
+            if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                return Response(
+                    status=HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag},
+                )
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs,
+        )
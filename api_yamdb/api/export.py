@@ -0,0 +1,126 @@
+"""
+Потоковая выгрузка записей в NDJSON или CSV.
+
+Строки читаются через .values_list().iterator() пачками по
+EXPORT_CHUNK_SIZE и сразу отдаются клиенту в StreamingHttpResponse,
+поэтому расход памяти не зависит от размера выгрузки.
+"""
+import csv
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+
+from api.permissions import IsAdmin
+from api.renderers import FastJSONRenderer
+from api.serializers import ExportSerializer
+from api.utils import DATETIME, batched
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson; charset=utf-8',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+
+class LineBuffer:
+    """Файлоподобный объект для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def stream_ndjson(columns, rows, size):
+    render = FastJSONRenderer().render
+    for chunk in batched(rows, size):
+        yield b''.join(
+            render(dict(zip(columns, row))) + b'\n' for row in chunk
+        )
+
+
+def stream_csv(columns, rows, size):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(columns).encode()
+    for chunk in batched(rows, size):
+        yield ''.join(writer.writerow(row) for row in chunk).encode()
+
+
+STREAMS = {NDJSON: stream_ndjson, CSV: stream_csv}
+
+
+class ExportView(APIView):
+    """
+    Базовое представление выгрузки для администраторов.
+
+    Наследники задают queryset, columns - пары (имя в выгрузке, поле
+    для values_list) - и title_field, поле произведения для фильтра title.
+    Формат выбирается параметром export_format (ndjson или csv):
+    параметр format в DRF зарезервирован за выбором рендерера.
+    """
+    permission_classes = (IsAdmin,)
+    basename = 'export'
+    queryset = None
+    columns = ()
+    title_field = None
+
+    def perform_content_negotiation(self, request, force=False):
+        # Тело ответа формируется без рендерера, поэтому заголовок Accept
+        # (например, text/csv) не должен приводить к 406.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_queryset(self, params):
+        """Записи выгрузки с учётом фильтров из параметров запроса."""
+        assert self.queryset is not None and self.title_field, (
+            f'{self.__class__.__name__} должен задать атрибуты queryset и '
+            f'title_field.'
+        )
+        return filter_by_params(self.queryset.all(), params, self.title_field)
+
+    def iter_rows(self, queryset):
+        fields = [field for _, field in self.columns]
+        date_indexes = [
+            index for index, field in enumerate(fields)
+            if field == 'pub_date'
+        ]
+        for row in queryset.values_list(*fields).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        ):
+            if date_indexes:
+                row = list(row)
+                for index in date_indexes:
+                    row[index] = DATETIME.to_representation(row[index])
+            yield row
+
+    def get(self, request):
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        export_format = params['export_format']
+        queryset = self.get_queryset(params).order_by('id')
+        response = StreamingHttpResponse(
+            STREAMS[export_format](
+                [name for name, _ in self.columns],
+                self.iter_rows(queryset),
+                settings.EXPORT_CHUNK_SIZE,
+            ),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.basename}.{export_format}"'
+        )
+        return response
+
+
+def filter_by_params(queryset, params, title_field):
+    """Общие фильтры выгрузки: произведение, автор, интервал дат."""
+    lookups = {
+        title_field: params.get('title'),
+        'author__username': params.get('author'),
+        'pub_date__gte': params.get('since'),
+        'pub_date__lt': params.get('until'),
+    }
+    return queryset.filter(**{
+        lookup: value for lookup, value in lookups.items()
+        if value is not None
+    })
@@ -1,13 +1,68 @@
+from collections import Counter
+
+from django.db.models import Count
 from django_filters import CharFilter, FilterSet
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import GenreTitle, Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
     name = CharFilter(field_name='name', lookup_expr='icontains')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'year', 'name')
+        fields = ('category', 'genre', 'year', 'name', 'search')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию, сортировка по релевантности."""
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений по ?ordering=. В конец добавляется id в том же
+    направлении, что и последнее поле: страницы не перемешиваются при
+    равных значениях, а порядок совпадает с порядком индекса по полю.
+    """
+    ordering_fields = ('rating', 'year', 'review_count', 'name')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or ordering[-1].lstrip('-') == 'id':
+            return ordering
+        direction = '-' if ordering[-1].startswith('-') else ''
+        return (*ordering, f'{direction}id')
+
+
+def get_title_facets(queryset):
+    """
+    Количество произведений из queryset по slug жанра, slug категории и
+    году. Выполняет два группирующих запроса: по жанрам и по парам
+    (категория, год), которые суммируются по отдельности.
+    """
+    title_ids = queryset.order_by().values('id')
+    genres = GenreTitle.objects.filter(
+        title__in=title_ids,
+    ).values_list('genre__slug').annotate(
+        count=Count('title', distinct=True),
+    ).order_by('-count', 'genre__slug')
+    categories = Counter()
+    years = Counter()
+    for category, year, count in Title.objects.filter(
+        id__in=title_ids,
+    ).values_list('category__slug', 'year').annotate(
+        count=Count('id'),
+    ).order_by():
+        if category is not None:
+            categories[category] += count
+        years[year] += count
+    return {
+        'genre': {slug: count for slug, count in genres if slug is not None},
+        'category': dict(categories.most_common()),
+        'year': dict(sorted(years.items())),
+    }
@@ -0,0 +1,270 @@
+import json
+import time
+from pathlib import Path
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import get_access_token
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import ADMIN, User
+
+BENCHMARK_USERNAME = 'benchmark_admin'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, rank):
+    """Перцентиль отсортированного списка (метод ближайшего ранга)."""
+    index = max(0, round(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера задержки и количества SQL-запросов каждого маршрута
+    API на текущих данных (см. generate_data).
+    """
+    help = 'Замеряет задержку и число SQL-запросов маршрутов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Количество замеров каждого маршрута.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Количество прогревочных запросов без замера.',
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для сохранения результатов в JSON.',
+        )
+        parser.add_argument(
+            '--baseline',
+            type=Path,
+            help='JSON с прошлыми результатами для сравнения.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый относительный рост p95 по сравнению с baseline.',
+        )
+
+    def get_client(self):
+        admin, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={
+                'email': f'{BENCHMARK_USERNAME}@yamdb.fake',
+                'role': ADMIN,
+            },
+        )
+        self.admin = admin
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(admin)}'
+        )
+        return client
+
+    def get_scenarios(self):
+        """
+        Запросы ко всем маршрутам api/urls.py: (имя, метод, url, данные).
+        Отзывы и комментарии берутся у самого популярного произведения,
+        выгрузки ограничены им же.
+        """
+        title = Title.objects.order_by('-review_count').first()
+        review = Review.objects.filter(title=title).annotate(
+            comments_count=Count('comments'),
+        ).order_by('-comments_count').first()
+        comment = Comment.objects.filter(review=review).first()
+        genre = Genre.objects.first()
+        category = Category.objects.first()
+        if not all((title, review, comment, genre, category)):
+            raise CommandError(
+                'Недостаточно данных: сначала выполните generate_data.'
+            )
+        user = User.objects.exclude(id=self.admin.id).first()
+        titles = '/api/v1/titles/'
+        title_url = f'{titles}{title.id}/'
+        reviews = f'{title_url}reviews/'
+        comments = f'{reviews}{review.id}/comments/'
+        users = '/api/v1/users/'
+        word = review.text.split()[0]
+        return (
+            ('titles-list', 'get', titles, None),
+            ('titles-list-genre', 'get', f'{titles}?genre={genre.slug}',
+             None),
+            ('titles-list-facets', 'get',
+             f'{titles}?facets=true&ordering=-rating', None),
+            ('titles-detail', 'get', title_url, None),
+            ('titles-create', 'post', titles, {
+                'name': 'Benchmark', 'year': 2000, 'description': 'benchmark',
+                'genre': [genre.slug], 'category': category.slug,
+            }),
+            ('titles-update', 'patch', title_url,
+             {'description': 'benchmark'}),
+            ('titles-replace', 'put', title_url, {
+                'name': title.name, 'year': title.year,
+                'description': 'benchmark', 'genre': [genre.slug],
+                'category': category.slug,
+            }),
+            ('titles-delete', 'delete', title_url, None),
+            ('genres-list', 'get', '/api/v1/genres/', None),
+            ('genres-create', 'post', '/api/v1/genres/',
+             {'name': 'Benchmark', 'slug': 'benchmark'}),
+            ('genres-delete', 'delete', f'/api/v1/genres/{genre.slug}/',
+             None),
+            ('categories-list', 'get', '/api/v1/categories/', None),
+            ('categories-create', 'post', '/api/v1/categories/',
+             {'name': 'Benchmark', 'slug': 'benchmark'}),
+            ('categories-delete', 'delete',
+             f'/api/v1/categories/{category.slug}/', None),
+            ('reviews-list', 'get', reviews, None),
+            ('reviews-list-cursor', 'get', f'{reviews}?cursor=', None),
+            ('reviews-detail', 'get', f'{reviews}{review.id}/', None),
+            ('reviews-create', 'post', reviews,
+             {'text': 'benchmark', 'score': 5}),
+            ('reviews-update', 'patch', f'{reviews}{review.id}/',
+             {'score': 7}),
+            ('reviews-delete', 'delete', f'{reviews}{review.id}/', None),
+            ('reviews-search', 'get', f'/api/v1/search/reviews/?q={word}',
+             None),
+            ('comments-list', 'get', comments, None),
+            ('comments-list-cursor', 'get', f'{comments}?cursor=', None),
+            ('comments-detail', 'get', f'{comments}{comment.id}/', None),
+            ('comments-create', 'post', comments, {'text': 'benchmark'}),
+            ('comments-update', 'patch', f'{comments}{comment.id}/',
+             {'text': 'benchmark'}),
+            ('comments-delete', 'delete', f'{comments}{comment.id}/', None),
+            ('autocomplete', 'get',
+             f'/api/v1/autocomplete/?q={title.name[:2]}', None),
+            ('export-reviews', 'get',
+             f'/api/v1/export/reviews/?title={title.id}', None),
+            ('export-comments', 'get',
+             f'/api/v1/export/comments/?title={title.id}', None),
+            ('users-list', 'get', users, None),
+            ('users-create', 'post', users, {
+                'username': BENCHMARK_USERNAME + '_new',
+                'email': f'{BENCHMARK_USERNAME}_new@yamdb.fake',
+            }),
+            ('users-detail', 'get', f'{users}{user.username}/', None),
+            ('users-update', 'patch', f'{users}{user.username}/',
+             {'bio': 'benchmark'}),
+            ('users-delete', 'delete', f'{users}{user.username}/', None),
+            ('users-me', 'get', f'{users}me/', None),
+            ('users-me-update', 'patch', f'{users}me/',
+             {'bio': 'benchmark'}),
+            ('signup', 'post', '/api/v1/auth/signup/',
+             {'username': user.username, 'email': user.email}),
+            ('token', 'post', '/api/v1/auth/token/', {
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user),
+            }),
+        )
+
+    def measure(self, client, method, url, data):
+        """
+        Выполняет запрос внутри откатываемой транзакции, чтобы запросы на
+        запись не меняли данные между замерами. Тело потокового ответа
+        читается целиком в пределах замера.
+        """
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = getattr(client, method)(
+                    url, data=data, format='json',
+                )
+                body = (
+                    b''.join(response.streaming_content)
+                    if response.streaming else response.content
+                )
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{method.upper()} {url}: статус {response.status_code} '
+                f'{body.decode()[:200]}'
+            )
+        return elapsed * 1000, len(context.captured_queries)
+
+    def run_scenario(self, client, method, url, data, repeat, warmup):
+        for _ in range(warmup):
+            self.measure(client, method, url, data)
+        timings = []
+        queries = set()
+        for _ in range(repeat):
+            elapsed, query_count = self.measure(client, method, url, data)
+            timings.append(elapsed)
+            queries.add(query_count)
+        timings.sort()
+        result = {
+            f'p{rank}_ms': round(percentile(timings, rank), 3)
+            for rank in PERCENTILES
+        }
+        result['mean_ms'] = round(sum(timings) / len(timings), 3)
+        result['max_ms'] = round(timings[-1], 3)
+        result['queries'] = max(queries)
+        return result
+
+    def compare(self, results, baseline, tolerance):
+        """Возвращает список регрессий относительно baseline."""
+        regressions = []
+        for name, current in results['endpoints'].items():
+            previous = baseline['endpoints'].get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name}: SQL-запросов {previous["queries"]} -> '
+                    f'{current["queries"]}'
+                )
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {previous["p95_ms"]} -> '
+                    f'{current["p95_ms"]} мс'
+                )
+        return regressions
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть больше нуля.')
+        client = self.get_client()
+        results = {
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Title, Review, Comment)
+            },
+            'repeat': options['repeat'],
+            'endpoints': {},
+        }
+        for name, method, url, data in self.get_scenarios():
+            results['endpoints'][name] = self.run_scenario(
+                client, method, url, data,
+                options['repeat'], options['warmup'],
+            )
+        report = json.dumps(results, ensure_ascii=False, indent=2)
+        if options['output']:
+            options['output'].write_text(report, encoding='utf8')
+        else:
+            self.stdout.write(report)
+        if options['baseline']:
+            baseline = json.loads(
+                options['baseline'].read_text(encoding='utf8'),
+            )
+            regressions = self.compare(
+                results, baseline, options['tolerance'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Обнаружены регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write('Регрессий относительно baseline нет.')
@@ -0,0 +1,97 @@
+import io
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from api.values import ReviewValuesSerializer, TitleValuesSerializer
+from api.views import TitleViewSet
+from reviews.models import Review, Title
+
+
+class ASCIIJSONRenderer(JSONRenderer):
+    """JSONRenderer с UNICODE_JSON = False: кириллица в виде \\uXXXX."""
+    ensure_ascii = True
+
+
+class Command(BaseCommand):
+    """
+    Микробенчмарк JSON: время рендеринга и разбора и размер страниц
+    произведений и отзывов для стандартных и быстрых рендерера и парсера.
+    """
+    help = 'Сравнивает JSON-рендереры и парсеры на страницах API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=100,
+            help='Количество объектов на странице.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Количество повторов каждого замера.',
+        )
+
+    def get_pages(self, size):
+        """Страницы в том виде, в котором их отдаёт API."""
+        titles = TitleValuesSerializer()
+        title = Title.objects.order_by('-review_count').first()
+        if title is None or not title.review_count:
+            raise CommandError(
+                'Недостаточно данных: сначала выполните generate_data.'
+            )
+        reviews = ReviewValuesSerializer()
+        return {
+            'titles': self.paginated(titles.to_representation(
+                titles.get_values(TitleViewSet.queryset)[:size],
+            )),
+            'reviews': self.paginated(reviews.to_representation(
+                reviews.get_values(Review.objects.filter(title=title))[:size],
+            )),
+        }
+
+    @staticmethod
+    def paginated(results):
+        return {
+            'count': len(results), 'next': None, 'previous': None,
+            'results': results,
+        }
+
+    def measure(self, function, repeat):
+        return timeit.timeit(function, number=repeat) / repeat * 1e6
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['repeat'] < 1:
+            raise CommandError('--size и --repeat должны быть больше нуля.')
+        repeat = options['repeat']
+        self.stdout.write(
+            f'orjson: {"установлен" if orjson else "не установлен"}'
+        )
+        renderers = (
+            ('ascii', ASCIIJSONRenderer()),
+            ('drf', JSONRenderer()),
+            ('fast', FastJSONRenderer()),
+        )
+        parsers = (('drf', JSONParser()), ('fast', FastJSONParser()))
+        for name, page in self.get_pages(options['size']).items():
+            content = JSONRenderer().render(page)
+            for label, renderer in renderers:
+                size = len(renderer.render(page))
+                elapsed = self.measure(lambda: renderer.render(page), repeat)
+                self.stdout.write(
+                    f'{name} render {label}: {elapsed:.1f} мкс, '
+                    f'{size} байт'
+                )
+            for label, parser in parsers:
+                elapsed = self.measure(
+                    lambda: parser.parse(io.BytesIO(content)), repeat,
+                )
+                self.stdout.write(
+                    f'{name} parse {label}: {elapsed:.1f} мкс'
+                )
@@ -0,0 +1,125 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.filters import TitleFilter
+from api.views import TitleViewSet
+from reviews.models import Comment, Genre, Review
+from reviews.search import search_reviews
+
+# Виртуальная таблица FTS5 с номером индекса (INDEX N:M...) ищет по
+# полнотекстовому индексу, а не перебирает строки.
+FULL_SCAN = re.compile(
+    r'\bSCAN (?:TABLE )?(\w+)\b(?! USING| VIRTUAL TABLE INDEX \d+:M)'
+)
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def get_checked_queries():
+    """
+    Запросы, которые выполняет API: (имя, queryset, нужен ли порядок по
+    индексу без сортировки во временном B-дереве).
+    """
+    page = settings.REST_FRAMEWORK['PAGE_SIZE']
+    titles = TitleViewSet.queryset
+
+    def filtered(**params):
+        return TitleFilter(params, queryset=titles).qs[:page]
+
+    return (
+        ('titles-list', titles[:page], True),
+        ('titles-list-genre', filtered(genre='slug'), False),
+        ('titles-list-category', filtered(category='slug'), False),
+        ('titles-list-year', filtered(year=2000), False),
+        ('titles-search', filtered(search='слово'), False),
+        ('titles-top-rated', titles.order_by('-rating', '-id')[:page], True),
+        ('titles-by-year', titles.order_by('year', 'id')[:page], True),
+        (
+            'titles-most-reviewed',
+            titles.order_by('-review_count', '-id')[:page],
+            True,
+        ),
+        (
+            'titles-top-rated-genre',
+            TitleFilter({'genre': 'slug'}, queryset=titles).qs.order_by(
+                '-rating', '-id',
+            )[:page],
+            False,
+        ),
+        ('titles-genres', Genre.objects.filter(title__in=[1, 2]), False),
+        ('reviews-list', Review.objects.filter(title_id=1)[:page], True),
+        (
+            'reviews-list-cursor',
+            Review.objects.filter(title_id=1).order_by('pub_date', 'id')[
+                :page
+            ],
+            True,
+        ),
+        (
+            'reviews-count',
+            Review.objects.filter(title_id=1).values('id'),
+            False,
+        ),
+        (
+            'reviews-author-exists',
+            Review.objects.filter(title_id=1, author_id=1).values('id'),
+            False,
+        ),
+        (
+            'reviews-search',
+            search_reviews(Review.objects.all(), 'слово')[:page],
+            False,
+        ),
+        ('comments-list', Comment.objects.filter(review_id=1)[:page], True),
+        (
+            'comments-list-cursor',
+            Comment.objects.filter(review_id=1).order_by('pub_date', 'id')[
+                :page
+            ],
+            True,
+        ),
+        (
+            'comments-count',
+            Comment.objects.filter(review_id=1).values('id'),
+            False,
+        ),
+    )
+
+
+def find_problems(plan, sorted_by_index):
+    """Возвращает список проблем в плане запроса SQLite."""
+    problems = [
+        f'полный просмотр таблицы {table}'
+        for table in FULL_SCAN.findall(plan)
+    ]
+    if sorted_by_index and TEMP_SORT in plan:
+        problems.append('сортировка без индекса')
+    return problems
+
+
+class Command(BaseCommand):
+    """
+    Команда проверки планов (EXPLAIN QUERY PLAN) запросов API: каждый
+    запрос должен использовать индекс, а не просматривать таблицу целиком.
+    """
+    help = 'Проверяет, что запросы API используют индексы.'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Проверка планов поддерживается только SQLite.')
+        failures = []
+        for name, queryset, sorted_by_index in get_checked_queries():
+            plan = queryset.explain()
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            failures.extend(
+                f'{name}: {problem}'
+                for problem in find_problems(plan, sorted_by_index)
+            )
+        if failures:
+            raise CommandError(
+                'Запросы без индекса:\n' + '\n'.join(failures)
+            )
+        self.stdout.write('Все запросы API используют индексы.')
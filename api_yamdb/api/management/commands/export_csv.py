@@ -0,0 +1,74 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.management.commands.import_csv import GZIP_SUFFIX, TABLES, open_csv
+from api.utils import DATETIME
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def format_row(row):
+    """Даты - в ISO 8601, как в исходных csv; None csv.writer пишет пустым."""
+    return [
+        DATETIME.to_representation(value)
+        if isinstance(value, datetime) else value
+        for value in row
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Команда для выгрузки базы данных в csv-файлы в формате, который
+    читает import_csv. Строки читаются через .iterator() и сразу пишутся
+    в файл, поэтому расход памяти не зависит от объёма данных.
+    """
+    help = 'Выгружает данные из базы в csv-файлы для import_csv.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            type=Path,
+            required=True,
+            help='Каталог для csv-файлов.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы (*.csv.gz).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз.',
+        )
+
+    def export_table(self, path, model, columns, chunk_size):
+        rows = model.objects.order_by('id').values_list(
+            *columns.values(),
+        ).iterator(chunk_size=chunk_size)
+        exported = 0
+        with open_csv(path, 'w') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns.keys())
+            for row in rows:
+                writer.writerow(format_row(row))
+                exported += 1
+        self.stdout.write(f'{path.name}: выгружено {exported}')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        data_dir = options['data_dir']
+        data_dir.mkdir(parents=True, exist_ok=True)
+        suffix = GZIP_SUFFIX if options['gzip'] else ''
+        for filename, model, columns, _ in TABLES:
+            self.export_table(
+                data_dir / f'{filename}{suffix}',
+                model,
+                columns,
+                options['chunk_size'],
+            )
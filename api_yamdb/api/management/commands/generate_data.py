@@ -0,0 +1,219 @@
+import random
+from datetime import timedelta
+from itertools import count
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.autocomplete import invalidate_autocomplete
+from api.cache import invalidate_catalog
+from api.utils import batched, keep_auto_now_add
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from user.models import MODERATOR, USER, User
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка', 'сцена',
+    'роль', 'история', 'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо',
+    'рекомендую', 'пересматривал', 'атмосфера', 'диалоги', 'актёры',
+)
+# Показатель степени распределения Парето: чем меньше, тем сильнее перекос
+# в сторону популярных произведений и отзывов.
+PARETO_ALPHA = 1.5
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 7, 10, 12, 9, 6)
+PUB_DATE_SPREAD = timedelta(days=3 * 365)
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def skewed_count(mean):
+    """Случайное целое с распределением Парето и заданным средним."""
+    scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+    return int(scale * random.paretovariate(PARETO_ALPHA) + random.random())
+
+
+def zipf_weights(size):
+    return [1 / rank for rank in range(1, size + 1)]
+
+
+def random_text(min_words, max_words):
+    return ' '.join(
+        random.choices(WORDS, k=random.randint(min_words, max_words))
+    ).capitalize()
+
+
+def random_pub_date(now):
+    return now - PUB_DATE_SPREAD * random.random()
+
+
+class Command(BaseCommand):
+    """Команда для генерации синтетических данных большого объёма."""
+    help = (
+        'Создаёт пользователей, категории, жанры, произведения, отзывы и '
+        'комментарии с неравномерным (Парето/Ципф) распределением.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 10),
+            ('genres', 30),
+            ('titles', 1000),
+            ('reviews', 20000),
+            ('comments', 20000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Количество создаваемых объектов ({name}).',
+            )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора случайных чисел.',
+        )
+
+    def insert(self, model, objects):
+        """Записывает объекты пачками, возвращает их количество."""
+        created = 0
+        with keep_auto_now_add(model):
+            for batch in batched(objects, self.batch_size):
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+                created += len(batch)
+        self.stdout.write(f'{model._meta.model_name}: {created}')
+        return created
+
+    def generate_users(self, amount):
+        start = next_id(User)
+        roles = random.choices(
+            (USER, MODERATOR), weights=(95, 5), k=amount,
+        )
+        self.insert(User, (
+            User(
+                id=user_id,
+                username=f'bench{user_id}',
+                email=f'bench{user_id}@yamdb.fake',
+                role=role,
+            )
+            for user_id, role in zip(count(start), roles)
+        ))
+        return range(start, start + amount)
+
+    def generate_named(self, model, amount, prefix):
+        start = next_id(model)
+        self.insert(model, (
+            model(
+                id=obj_id,
+                name=f'{prefix} {obj_id}',
+                slug=f'{prefix}-{obj_id}',
+            )
+            for obj_id in range(start, start + amount)
+        ))
+        return list(range(start, start + amount))
+
+    def generate_titles(self, amount, category_ids, genre_ids):
+        start = next_id(Title)
+        current_year = timezone.now().year
+        category_weights = zipf_weights(len(category_ids))
+        self.insert(Title, (
+            Title(
+                id=title_id,
+                name=random_text(1, 4),
+                year=random.randint(1900, current_year),
+                description=random_text(10, 40),
+                category_id=random.choices(
+                    category_ids, category_weights,
+                )[0] if category_ids else None,
+            )
+            for title_id in range(start, start + amount)
+        ))
+        genre_weights = zipf_weights(len(genre_ids))
+        if genre_ids:
+            self.insert(GenreTitle, (
+                GenreTitle(title_id=title_id, genre_id=genre_id)
+                for title_id in range(start, start + amount)
+                for genre_id in set(random.choices(
+                    genre_ids, genre_weights, k=random.randint(1, 3),
+                ))
+            ))
+        return range(start, start + amount)
+
+    def iter_reviews(self, amount, title_ids, author_ids, start):
+        """Отзывы с неравномерным распределением по произведениям."""
+        now = timezone.now()
+        review_ids = count(start)
+        remaining = amount
+        mean = amount / len(title_ids)
+        for title_id in title_ids:
+            size = min(skewed_count(mean), len(author_ids), remaining)
+            for author_id in random.sample(author_ids, size):
+                yield Review(
+                    id=next(review_ids),
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=random_text(5, 60),
+                    score=random.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                    pub_date=random_pub_date(now),
+                )
+            remaining -= size
+            if not remaining:
+                return
+
+    def iter_comments(self, amount, review_ids, author_ids):
+        """Комментарии с неравномерным распределением по отзывам."""
+        now = timezone.now()
+        remaining = amount
+        mean = amount / len(review_ids)
+        while remaining:
+            for review_id in review_ids:
+                size = min(skewed_count(mean), remaining)
+                for _ in range(size):
+                    yield Comment(
+                        review_id=review_id,
+                        author_id=random.choice(author_ids),
+                        text=random_text(3, 30),
+                        pub_date=random_pub_date(now),
+                    )
+                remaining -= size
+                if not remaining:
+                    return
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.batch_size = options['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        with transaction.atomic():
+            author_ids = self.generate_users(options['users'])
+            if not author_ids:
+                author_ids = list(User.objects.values_list('id', flat=True))
+            category_ids = self.generate_named(
+                Category, options['categories'], 'category',
+            )
+            genre_ids = self.generate_named(
+                Genre, options['genres'], 'genre',
+            )
+            title_ids = self.generate_titles(
+                options['titles'], category_ids, genre_ids,
+            )
+            reviews = 0
+            review_start = next_id(Review)
+            if title_ids and author_ids and options['reviews']:
+                reviews = self.insert(Review, self.iter_reviews(
+                    options['reviews'], title_ids, author_ids, review_start,
+                ))
+            if reviews and options['comments']:
+                self.insert(Comment, self.iter_comments(
+                    options['comments'],
+                    range(review_start, review_start + reviews),
+                    author_ids,
+                ))
+            Title.objects.recalculate_rating()
+        invalidate_catalog()
+        invalidate_autocomplete()
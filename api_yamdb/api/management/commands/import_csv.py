@@ -1,140 +1,454 @@
 import csv
+import gzip
+import json
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from api.autocomplete import invalidate_autocomplete
+from api.cache import invalidate_catalog
+from api.utils import batched, keep_auto_now_add
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from user.models import User
 
+DEFAULT_BATCH_SIZE = 1000
+GZIP_SUFFIX = '.gz'
+# Сколько отклонённых строк каждого файла выводить без --report.
+PRINTED_REJECTIONS = 20
+
+# Файл, модель, соответствие колонок csv полям модели и внешние ключи.
+# Колонки, которых нет в файле, пропускаются (description в titles.csv).
+# Обязательные в модели поля, которых нет в исходных static/data: у
+# загруженных из них записей пустые значения, и выгрузка export_csv
+# должна загружаться обратно.
+OPTIONAL_FIELDS = frozenset({(Title, 'description')})
+TABLES = (
+    (
+        'users.csv', User,
+        {
+            'id': 'id',
+            'username': 'username',
+            'email': 'email',
+            'role': 'role',
+            'bio': 'bio',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+        },
+        {},
+    ),
+    (
+        'category.csv', Category,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+        {},
+    ),
+    (
+        'genre.csv', Genre,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+        {},
+    ),
+    (
+        'titles.csv', Title,
+        {
+            'id': 'id',
+            'name': 'name',
+            'year': 'year',
+            'category': 'category_id',
+            'description': 'description',
+        },
+        {'category_id': Category},
+    ),
+    (
+        'genre_title.csv', GenreTitle,
+        {'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id'},
+        {'title_id': Title, 'genre_id': Genre},
+    ),
+    (
+        'review.csv', Review,
+        {
+            'id': 'id',
+            'title_id': 'title_id',
+            'text': 'text',
+            'author': 'author_id',
+            'score': 'score',
+            'pub_date': 'pub_date',
+        },
+        {'title_id': Title, 'author_id': User},
+    ),
+    (
+        'comments.csv', Comment,
+        {
+            'id': 'id',
+            'review_id': 'review_id',
+            'text': 'text',
+            'author': 'author_id',
+            'pub_date': 'pub_date',
+        },
+        {'review_id': Review, 'author_id': User},
+    ),
+)
+
+
+def open_csv(path, mode='r'):
+    """Открывает csv-файл, в том числе сжатый gzip (*.csv.gz)."""
+    if path.suffix == GZIP_SUFFIX:
+        return gzip.open(path, f'{mode}t', encoding='utf8', newline='')
+    return open(path, mode, encoding='utf8', newline='')
+
+
+def find_csv(data_dir, filename):
+    """Путь к csv-файлу или к его сжатой версии, если несжатой нет."""
+    path = data_dir / filename
+    compressed = data_dir / f'{filename}{GZIP_SUFFIX}'
+    if not path.exists() and compressed.exists():
+        return compressed
+    return path
+
+
+def read_records(reader):
+    """
+    Записи csv с номером первой строки записи в файле (текст отзыва
+    может занимать несколько строк).
+    """
+    line = reader.line_num + 1
+    for row in reader:
+        yield line, row
+        line = reader.line_num + 1
+
+
+def clean_value(field, value):
+    """
+    Значение ячейки в типе поля с проверкой валидаторами поля. Пустая
+    ячейка - NULL, если поле допускает, и ошибка для обязательного поля
+    (blank=False, кроме OPTIONAL_FIELDS). Существование внешних ключей
+    проверяется при записи: рабочие процессы не обращаются к БД.
+    """
+    if value is None:
+        raise ValidationError('нет значения')
+    if value == '' and field.null:
+        return None
+    if value == '' and (field.model, field.name) in OPTIONAL_FIELDS:
+        return value
+    value = field.to_python(value)
+    if not field.is_relation:
+        field.validate(value, None)
+        field.run_validators(value)
+    return value
+
+
+def parse_batch(model_label, columns, records):
+    """
+    Этап разбора: превращает записи csv в словари значений полей.
+    Возвращает разобранные записи и отклонённые (номер строки, причина).
+    """
+    model = apps.get_model(model_label)
+    fields = {
+        column: model._meta.get_field(field)
+        for column, field in columns.items()
+    }
+    parsed = []
+    rejected = []
+    for line, row in records:
+        data = {}
+        errors = []
+        for column, field in fields.items():
+            try:
+                data[columns[column]] = clean_value(field, row[column])
+            except ValidationError as error:
+                errors.append(f'{column}: {" ".join(error.messages)}')
+        if errors:
+            rejected.append((line, '; '.join(errors)))
+        else:
+            parsed.append((line, data))
+    return parsed, rejected
+
+
+def init_worker():
+    """Готовит Django в рабочем процессе, запущенном через spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+class Checkpoint:
+    """
+    Файл с числом зафиксированных строк каждого csv-файла. Позиция
+    учитывается, только если размер и время изменения файла не менялись.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = (
+            json.loads(path.read_text(encoding='utf8'))
+            if path.exists() else {}
+        )
+
+    @staticmethod
+    def get_signature(csv_path):
+        stat = csv_path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get_position(self, csv_path):
+        entry = self.state.get(csv_path.name)
+        if entry and entry['signature'] == self.get_signature(csv_path):
+            return entry['rows']
+        return 0
+
+    def save(self, csv_path, rows):
+        self.state[csv_path.name] = {
+            'signature': self.get_signature(csv_path),
+            'rows': rows,
+        }
+        temporary = self.path.with_name(f'{self.path.name}.tmp')
+        temporary.write_text(json.dumps(self.state), encoding='utf8')
+        temporary.replace(self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
 
 class Command(BaseCommand):
-    """Команда для импорта csv-файлов в базу данных."""
-    def import_user(self):
-        """Функция для импорта в таблицу user."""
-        with open(
-            'api_yamdb/static/data/users.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    User.objects.get_or_create(
-                        id=row[0],
-                        username=row[1],
-                        email=row[2],
-                        role=row[3],
-                        bio=row[4],
-                        first_name=row[5],
-                        last_name=row[6],
-                    )
-
-    def import_category(self):
-        """Функция для импорта в таблицу category."""
-        with open(
-            'api_yamdb/static/data/category.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    Category.objects.get_or_create(
-                        id=row[0],
-                        name=row[1],
-                        slug=row[2],
-                    )
-
-    def import_genre(self):
-        """Функция для импорта в таблицу genre."""
-        with open(
-            'api_yamdb/static/data/genre.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    Genre.objects.get_or_create(
-                        id=row[0],
-                        name=row[1],
-                        slug=row[2],
-                    )
-
-    def import_titles(self):
-        """Функция для импорта в таблицу title."""
-        with open(
-            'api_yamdb/static/data/titles.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    category = Category.objects.get(id=row[3])
-                    Title.objects.get_or_create(
-                        id=row[0],
-                        name=row[1],
-                        year=row[2],
-                        category=category,
-                    )
-
-    def import_genre_title(self):
-        """Функция для импорта в таблицу genretitle."""
-        with open(
-            'api_yamdb/static/data/genre_title.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    title_id = Title.objects.get(id=row[1])
-                    genre_id = Genre.objects.get(id=row[2])
-                    GenreTitle.objects.get_or_create(
-                        id=row[0],
-                        title=title_id,
-                        genre=genre_id,
-                    )
-
-    def import_review(self):
-        """Функция для импорта в таблицу review."""
-        with open(
-            'api_yamdb/static/data/review.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    title_id = Title.objects.get(id=row[1])
-                    author = User.objects.get(id=row[3])
-                    Review.objects.get_or_create(
-                        id=row[0],
-                        title=title_id,
-                        text=row[2],
-                        author=author,
-                        score=row[4],
-                        pub_date=row[5],
-                    )
-
-    def import_comments(self):
-        """Функция для импорта в таблицу comment."""
-        with open(
-            'api_yamdb/static/data/comments.csv',
-            encoding='utf8',
-        ) as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] != 'id':
-                    review_id = Review.objects.get(id=row[1])
-                    author = User.objects.get(id=row[3])
-                    Comment.objects.get_or_create(
-                        id=row[0],
-                        review=review_id,
-                        text=row[2],
-                        author=author,
-                        pub_date=row[4],
-                    )
+    """
+    Команда для импорта csv-файлов в базу данных.
+
+    Файл читается пачками: разбор и проверка значений выполняются в
+    --workers процессах, запись в БД - одним потоком в основном процессе
+    в исходном порядке пачек. Строки с ошибками не прерывают импорт, а
+    попадают в отчёт (--report) с номером строки и причиной.
+    """
+    help = 'Импортирует csv-файлы с данными в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Каталог с csv-файлами (или *.csv.gz).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT-запросе.',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Добавлять новые и обновлять изменившиеся строки, '
+                'пропуская совпадающие с базой.'
+            ),
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=Path,
+            help=(
+                'Файл с позицией импорта: каждая пачка фиксируется '
+                'отдельно, прерванный импорт продолжается с места '
+                'остановки.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для разбора и проверки строк.',
+        )
+        parser.add_argument(
+            '--report',
+            type=Path,
+            help='csv-файл для отклонённых строк (file, line, reason).',
+        )
+
+    def parse_batches(self, model, columns, batches, workers):
+        """
+        Разобранные пачки в исходном порядке: (число записей, результат
+        parse_batch). В обработке одновременно не больше 2 * workers
+        пачек, поэтому файл не читается в память целиком.
+        """
+        label = model._meta.label
+        if workers == 1:
+            for records in batches:
+                yield len(records), parse_batch(label, columns, records)
+            return
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            pending = deque()
+            for records in batches:
+                pending.append((
+                    len(records),
+                    pool.submit(parse_batch, label, columns, records),
+                ))
+                if len(pending) >= 2 * workers:
+                    count, future = pending.popleft()
+                    yield count, future.result()
+            while pending:
+                count, future = pending.popleft()
+                yield count, future.result()
+
+    @staticmethod
+    def check_foreign_keys(model, data, known_ids):
+        """Причина отклонения, если внешний ключ не ссылается на запись."""
+        for field, ids in known_ids.items():
+            if data[field] is None:
+                if not model._meta.get_field(field).null:
+                    return f'{field}: пустая ссылка'
+            elif data[field] not in ids:
+                return f'{field}: нет записи с id {data[field]}'
+        return None
+
+    def reject(self, path, rejected):
+        self.counts['skipped'] += len(rejected)
+        for line, reason in rejected:
+            if self.report is not None:
+                self.report.writerow((path.name, line, reason))
+            elif self.counts['printed'] < PRINTED_REJECTIONS:
+                self.counts['printed'] += 1
+                self.stderr.write(f'{path.name}:{line}: {reason}')
+
+    def insert_batch(self, model, objects, batch_size):
+        model.objects.bulk_create(
+            objects,
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        self.counts['processed'] += len(objects)
+
+    def upsert_batch(self, model, objects, fields, batch_size):
+        """
+        Добавляет строки с новыми id и обновляет изменившиеся; строки,
+        совпадающие с базой, не трогает. Существующие значения пачки
+        читаются одним запросом.
+        """
+        existing = {
+            row[0]: row[1:]
+            for row in model.objects.filter(
+                id__in=[obj.id for obj in objects],
+            ).values_list('id', *fields)
+        }
+        created = [obj for obj in objects if obj.id not in existing]
+        changed = [
+            obj for obj in objects
+            if obj.id in existing and existing[obj.id] != tuple(
+                getattr(obj, field) for field in fields
+            )
+        ]
+        model.objects.bulk_create(
+            created,
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        if changed:
+            model.objects.bulk_update(changed, fields, batch_size=batch_size)
+        self.counts['created'] += len(created)
+        self.counts['updated'] += len(changed)
+        self.counts['unchanged'] += len(objects) - len(created) - len(changed)
+
+    def write_batch(self, model, parsed, known_ids, fields, options):
+        """Этап записи: проверка внешних ключей и запись пачки в БД."""
+        objects = []
+        rejected = []
+        for line, data in parsed:
+            reason = self.check_foreign_keys(model, data, known_ids)
+            if reason is None:
+                objects.append(model(**data))
+            else:
+                rejected.append((line, reason))
+        with transaction.atomic():
+            if options['incremental']:
+                self.upsert_batch(
+                    model, objects, fields, options['batch_size'],
+                )
+            else:
+                self.insert_batch(model, objects, options['batch_size'])
+        return rejected
+
+    def import_table(self, path, model, columns, foreign_keys, options):
+        """
+        Импортирует один csv-файл пачками: в одной транзакции или, с
+        --checkpoint, фиксируя и запоминая каждую пачку.
+        """
+        self.counts = Counter()
+        checkpoint = self.checkpoint
+        position = checkpoint.get_position(path) if checkpoint else 0
+        known_ids = {
+            field: set(related.objects.values_list('id', flat=True))
+            for field, related in foreign_keys.items()
+        }
+        table_transaction = (
+            nullcontext() if checkpoint else transaction.atomic()
+        )
+        with open_csv(path) as csvfile, table_transaction, \
+                keep_auto_now_add(model):
+            reader = csv.DictReader(csvfile)
+            columns = {
+                column: field for column, field in columns.items()
+                if column in (reader.fieldnames or ())
+            }
+            fields = [field for field in columns.values() if field != 'id']
+            batches = batched(
+                islice(read_records(reader), position, None),
+                options['batch_size'],
+            )
+            for count, (parsed, rejected) in self.parse_batches(
+                model, columns, batches, options['workers'],
+            ):
+                rejected += self.write_batch(
+                    model, parsed, known_ids, fields, options,
+                )
+                self.reject(path, sorted(rejected))
+                position += count
+                if checkpoint:
+                    checkpoint.save(path, position)
+        if options['incremental']:
+            self.stdout.write(
+                f'{path.name}: добавлено {self.counts["created"]}, '
+                f'обновлено {self.counts["updated"]}, '
+                f'без изменений {self.counts["unchanged"]}, '
+                f'пропущено {self.counts["skipped"]}'
+            )
+        else:
+            self.stdout.write(
+                f'{path.name}: обработано {self.counts["processed"]}, '
+                f'пропущено {self.counts["skipped"]}'
+            )
 
     def handle(self, *args, **options):
-        self.import_user()
-        self.import_category()
-        self.import_genre()
-        self.import_titles()
-        self.import_genre_title()
-        self.import_review()
-        self.import_comments()
+        data_dir = options['data_dir']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if options['workers'] < 1:
+            raise CommandError('--workers должен быть больше нуля.')
+        self.checkpoint = (
+            Checkpoint(options['checkpoint'])
+            if options['checkpoint'] else None
+        )
+        paths = [
+            (find_csv(data_dir, filename), model, columns, foreign_keys)
+            for filename, model, columns, foreign_keys in TABLES
+        ]
+        for path, *_ in paths:
+            if not path.exists():
+                raise CommandError(f'Не найден файл {path}')
+        report_file = (
+            open(options['report'], 'w', encoding='utf8', newline='')
+            if options['report'] else nullcontext()
+        )
+        with report_file:
+            self.report = None
+            if options['report']:
+                self.report = csv.writer(report_file)
+                self.report.writerow(('file', 'line', 'reason'))
+            for path, model, columns, foreign_keys in paths:
+                self.import_table(path, model, columns, foreign_keys, options)
+        Title.objects.recalculate_rating()
+        invalidate_catalog()
+        invalidate_autocomplete()
+        if self.checkpoint:
+            self.checkpoint.clear()
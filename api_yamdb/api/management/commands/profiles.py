@@ -0,0 +1,88 @@
+import pstats
+from io import StringIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.profiling import list_profiles, parse_profile_name
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    """
+    Команда для просмотра профилей запросов (см. api.profiling): список
+    сохранённых профилей или сводка по выбранным профилям - самые
+    затратные функции, суммарно по всем выбранным файлам.
+    """
+    help = 'Показывает сохранённые профили запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help='Имена файлов профилей для сводки.',
+        )
+        parser.add_argument(
+            '--route',
+            help='Сводка по всем профилям маршрута, например api:titles-list.',
+        )
+        parser.add_argument(
+            '--sort',
+            choices=SORT_KEYS,
+            default='cumulative',
+            help='Порядок функций в сводке.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=30,
+            help='Количество функций в сводке.',
+        )
+
+    def get_profiles(self, options):
+        profiles = list_profiles()
+        if options['route']:
+            return [
+                path for path in profiles
+                if parse_profile_name(path)[1] == options['route']
+            ]
+        by_name = {path.name: path for path in profiles}
+        missing = [name for name in options['names'] if name not in by_name]
+        if missing:
+            raise CommandError(
+                'Не найдены профили: ' + ', '.join(missing)
+            )
+        return [by_name[name] for name in options['names']]
+
+    def list(self, profiles):
+        for path in profiles:
+            time, route = parse_profile_name(path)
+            stats = pstats.Stats(str(path))
+            self.stdout.write(
+                f'{path.name}  {time:%Y-%m-%d %H:%M:%S}  {route}  '
+                f'{stats.total_tt * 1000:.1f} мс  '
+                f'{stats.total_calls} вызовов'
+                if time else path.name
+            )
+
+    def summarize(self, profiles, sort, limit):
+        stream = StringIO()
+        stats = pstats.Stats(*map(str, profiles), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        self.stdout.write(
+            f'Профилей: {len(profiles)}, среднее время '
+            f'{stats.total_tt * 1000 / len(profiles):.1f} мс'
+        )
+        self.stdout.write(stream.getvalue())
+
+    def handle(self, *args, **options):
+        if not options['names'] and not options['route']:
+            profiles = list_profiles()
+            if not profiles:
+                self.stdout.write('Профилей нет.')
+            self.list(profiles)
+            return
+        profiles = self.get_profiles(options)
+        if not profiles:
+            raise CommandError('Профилей маршрута нет.')
+        self.summarize(profiles, options['sort'], options['limit'])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.autocomplete import invalidate_autocomplete
+from api.cache import invalidate_catalog
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта хранимого рейтинга произведений."""
+    help = 'Пересчитывает сумму оценок, число отзывов и рейтинг произведений.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.recalculate_rating()
+        invalidate_catalog()
+        invalidate_autocomplete()
+        self.stdout.write(f'Пересчитан рейтинг произведений: {updated}')
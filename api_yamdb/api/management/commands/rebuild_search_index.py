@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from reviews.search import is_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Команда для перестроения полнотекстовых индексов произведений и
+    отзывов, например после загрузки данных в обход триггеров.
+    """
+    help = 'Перестраивает полнотекстовые индексы FTS5.'
+
+    def handle(self, *args, **options):
+        if not is_supported(connection):
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только SQLite.'
+            )
+        with transaction.atomic():
+            rebuild_search_index()
+        self.stdout.write('Полнотекстовые индексы перестроены.')
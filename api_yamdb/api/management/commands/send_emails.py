@@ -0,0 +1,127 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from user.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    """Команда-обработчик очереди исходящих писем."""
+    help = 'Отправляет письма из очереди пачками через одно соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых за одно соединение.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval сек.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop.',
+        )
+
+    def claim_batch(self, batch_size):
+        """
+        Забирает пачку писем в короткой транзакции: next_attempt сдвигается
+        на EMAIL_OUTBOX_CLAIM_TIMEOUT, поэтому другие обработчики пропускают
+        эти письма, пока идёт отправка, а письма упавшего обработчика
+        возвращаются в очередь по истечении таймаута.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(
+                    skip_locked=True,
+                ).filter(
+                    sent__isnull=True,
+                    attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+                    next_attempt__lte=now,
+                )[:batch_size]
+            )
+            OutgoingEmail.objects.filter(
+                id__in=[email.id for email in emails],
+            ).update(next_attempt=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT,
+            ))
+        return emails
+
+    def send_batch(self, batch_size):
+        """
+        Отправляет одну пачку писем вне транзакции, возвращает их
+        количество. Если соединение не открылось, неудачной попыткой
+        считается отправка каждого письма пачки.
+        """
+        emails = self.claim_batch(batch_size)
+        if not emails:
+            return 0
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as error:
+            for email in emails:
+                email.attempts += 1
+                self.fail(email, error)
+        else:
+            try:
+                for email in emails:
+                    self.send_one(connection, email)
+            finally:
+                connection.close()
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'next_attempt', 'sent', 'last_error'),
+        )
+        return len(emails)
+
+    def fail(self, email, error):
+        """Запоминает ошибку и откладывает следующую попытку."""
+        email.last_error = repr(error)
+        email.next_attempt = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+            * 2 ** (email.attempts - 1),
+        )
+        self.stderr.write(f'{email}: {email.last_error}')
+
+    def send_one(self, connection, email):
+        """Отправляет письмо; при ошибке откладывает следующую попытку."""
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email.recipient],
+            connection=connection,
+        )
+        email.attempts += 1
+        try:
+            message.send()
+        except Exception as error:
+            self.fail(email, error)
+        else:
+            email.sent = timezone.now()
+            email.last_error = ''
+
+    def handle(self, *args, **options):
+        while True:
+            sent = 0
+            while True:
+                count = self.send_batch(options['batch_size'])
+                if not count:
+                    break
+                sent += count
+            if sent:
+                self.stdout.write(f'Обработано писем: {sent}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
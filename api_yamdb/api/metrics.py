@@ -0,0 +1,185 @@
+"""
+Метрики запросов в текстовом формате Prometheus.
+
+Счётчики хранятся в памяти процесса: каждый процесс сервера отдаёт свои
+значения, а Prometheus суммирует их по экземплярам. Метки ограничены
+именем маршрута из URLconf (например, api:titles-list), методом и
+классом статуса, поэтому число рядов не зависит от параметров запроса.
+"""
+from bisect import bisect_left
+from collections import Counter
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from api.profiling import is_admin_request
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METHODS = frozenset(
+    ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+)
+UNRESOLVED = '<unresolved>'
+OTHER = '<other>'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (
+    100, 1000, 10_000, 100_000, 1_000_000, 10_000_000,
+)
+HISTOGRAMS = (
+    (
+        'yamdb_http_request_duration_seconds',
+        'Время обработки запроса.',
+        LATENCY_BUCKETS,
+    ),
+    (
+        'yamdb_http_request_db_queries',
+        'Количество SQL-запросов на запрос.',
+        QUERY_BUCKETS,
+    ),
+    (
+        'yamdb_http_request_db_duration_seconds',
+        'Время SQL-запросов на запрос.',
+        LATENCY_BUCKETS,
+    ),
+    (
+        'yamdb_http_response_size_bytes',
+        'Размер тела ответа.',
+        SIZE_BUCKETS,
+    ),
+)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+        yield f'{name}_sum{{{labels}}} {self.sum:g}'
+        yield f'{name}_count{{{labels}}} {total}'
+
+
+class RequestMetrics:
+    """
+    Счётчики запросов по (маршрут, метод, класс статуса) и гистограммы по
+    (маршрут, метод). Маршрутов сверх METRICS_MAX_ROUTES учитываются под
+    меткой <other>.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = Counter()
+            self.histograms = {}
+
+    def get_series(self, route, method):
+        """Ключ ряда (маршрут, метод); новые ряды сверх лимита - <other>."""
+        key = (route, method)
+        if key not in self.histograms:
+            if len(self.histograms) >= settings.METRICS_MAX_ROUTES:
+                key = (OTHER, method)
+            self.histograms.setdefault(key, [
+                Histogram(buckets) for _, _, buckets in HISTOGRAMS
+            ])
+        return key
+
+    def observe(self, route, method, status, duration, queries,
+                db_duration, size):
+        if method not in METHODS:
+            method = OTHER
+        with self.lock:
+            route, method = self.get_series(route, method)
+            self.requests[route, method, f'{status // 100}xx'] += 1
+            for histogram, value in zip(
+                self.histograms[route, method],
+                (duration, queries, db_duration, size),
+            ):
+                histogram.observe(value)
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self.lock:
+            lines = [
+                '# HELP yamdb_http_requests_total Количество запросов.',
+                '# TYPE yamdb_http_requests_total counter',
+            ]
+            lines.extend(
+                f'yamdb_http_requests_total{{route="{route}",'
+                f'method="{method}",status="{status}"}} {count}'
+                for (route, method, status), count in sorted(
+                    self.requests.items()
+                )
+            )
+            for index, (name, help_text, _) in enumerate(HISTOGRAMS):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histograms in sorted(
+                    self.histograms.items()
+                ):
+                    lines.extend(histograms[index].render(
+                        name, f'route="{route}",method="{method}"',
+                    ))
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+class QueryStats:
+    """Количество и суммарное время SQL-запросов (execute_wrapper)."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.count += 1
+
+
+def check_metrics_access(request):
+    """
+    Метрики отдаются с заголовком Authorization: Bearer <METRICS_TOKEN>,
+    если токен задан, иначе только администраторам. Открыть их всем можно
+    явно, настройкой METRICS_PUBLIC.
+    """
+    if settings.METRICS_PUBLIC:
+        return
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}',
+        )
+    else:
+        allowed = is_admin_request(request)
+    if not allowed:
+        raise PermissionDenied
+
+
+def metrics_view(request):
+    check_metrics_access(request)
+    return HttpResponse(request_metrics.render(), content_type=CONTENT_TYPE)
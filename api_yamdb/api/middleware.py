@@ -0,0 +1,299 @@
+import json
+import logging
+import random
+import re
+from contextlib import ExitStack, nullcontext
+from cProfile import Profile
+from time import perf_counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from api.budgets import check_query_budget
+from api.metrics import UNRESOLVED, QueryStats, request_metrics
+from api.profiling import is_admin_request, save_profile
+
+slow_request_logger = logging.getLogger('api.slow_requests')
+query_budget_logger = logging.getLogger('api.query_budget')
+# Строковые литералы в планах запросов (EXPLAIN подставляет параметры).
+SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def capture_queries(stats):
+    """Подключает обёртку SQL-запросов ко всем соединениям с БД."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+    return stack
+
+
+def iter_streaming(content, stats, finish):
+    """
+    Части тела потокового ответа: SQL-запросы при их формировании
+    попадают в stats (если он задан), а после последней части вызывается
+    finish(размер).
+    """
+    content = iter(content)
+    size = 0
+    try:
+        while True:
+            with capture_queries(stats) if stats else nullcontext():
+                chunk = next(content, None)
+            if chunk is None:
+                return
+            size += len(chunk)
+            yield chunk
+    finally:
+        finish(size)
+
+
+class MetricsMiddleware:
+    """
+    Считает для каждого маршрута запросы, время обработки, количество и
+    время SQL-запросов и размер ответа (см. api.metrics).
+
+    У потоковых ответов время, SQL-запросы и размер учитываются после
+    отправки последней части тела.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        stats = QueryStats()
+        with capture_queries(stats):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = iter_streaming(
+                response.streaming_content,
+                stats,
+                lambda size: self.observe(
+                    request, response, started, stats, size,
+                ),
+            )
+        else:
+            self.observe(
+                request, response, started, stats, len(response.content),
+            )
+        return response
+
+    @staticmethod
+    def observe(request, response, started, stats, size):
+        match = request.resolver_match
+        request_metrics.observe(
+            route=match.view_name if match else UNRESOLVED,
+            method=request.method,
+            status=response.status_code,
+            duration=perf_counter() - started,
+            queries=stats.count,
+            db_duration=stats.duration,
+            size=size,
+        )
+
+
+class QueryBudgetMiddleware:
+    """
+    В режиме DEBUG сравнивает число SQL-запросов с бюджетом маршрута
+    (см. api.budgets): при превышении пишет предупреждение в логгер
+    api.query_budget или, с QUERY_BUDGET_ACTION = 'raise', вызывает
+    QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DEBUG or settings.QUERY_BUDGET_ACTION is None:
+            return self.get_response(request)
+        stats = QueryStats()
+        with capture_queries(stats):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = iter_streaming(
+                response.streaming_content,
+                stats,
+                lambda size: self.check(request, stats),
+            )
+        else:
+            self.check(request, stats)
+        return response
+
+    @staticmethod
+    def check(request, stats):
+        message = check_query_budget(request, stats.count)
+        if message is not None:
+            query_budget_logger.warning(message)
+
+
+class QueryLog:
+    """SQL-запросы с параметрами и временем выполнения (execute_wrapper)."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((
+                context['connection'].alias,
+                sql,
+                None if many else params,
+                perf_counter() - started,
+            ))
+
+
+def explain(alias, sql, params):
+    """
+    План запроса: EXPLAIN QUERY PLAN в SQLite, EXPLAIN в других БД.
+    Строковые значения параметров в плане заменяются на '?'.
+    """
+    connection = connections[alias]
+    prefix = (
+        'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [
+                SQL_STRING.sub("'?'", ' '.join(map(str, row)))
+                for row in cursor.fetchall()
+            ]
+    except DatabaseError as error:
+        return [f'{prefix}: {error}']
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class SlowRequestMiddleware:
+    """
+    Пишет в логгер api.slow_requests JSON-строку о запросах дольше
+    SLOW_REQUEST_THRESHOLD секунд или с SQL-запросом дольше
+    SLOW_QUERY_THRESHOLD: маршрут, параметры, SQL-запросы с временем и
+    планы самых медленных из них.
+
+    SQL-запросы собираются только у доли SLOW_REQUEST_SAMPLE_RATE
+    запросов; остальные медленные запросы попадают в лог без SQL. Без
+    SLOW_REQUEST_THRESHOLD лог выключен. В лог попадает текст SQL без
+    параметров: в них бывают коды подтверждения и другие секреты. У
+    потоковых ответов запись делается после отправки последней части.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.SLOW_REQUEST_THRESHOLD
+        if threshold is None:
+            return self.get_response(request)
+        log = None
+        started = perf_counter()
+        if random.random() < settings.SLOW_REQUEST_SAMPLE_RATE:
+            log = QueryLog()
+            with capture_queries(log):
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = iter_streaming(
+                response.streaming_content,
+                log,
+                lambda size: self.report(
+                    request, response, started, log, threshold,
+                ),
+            )
+        else:
+            self.report(request, response, started, log, threshold)
+        return response
+
+    def report(self, request, response, started, log, threshold):
+        duration = perf_counter() - started
+        slow_queries = [
+            query for query in (log.queries if log else ())
+            if query[3] >= settings.SLOW_QUERY_THRESHOLD
+        ]
+        if duration >= threshold or slow_queries:
+            slow_request_logger.warning(json.dumps(
+                self.get_record(request, response, duration, log),
+                ensure_ascii=False,
+                default=str,
+            ))
+
+    @staticmethod
+    def get_record(request, response, duration, log):
+        match = request.resolver_match
+        record = {
+            'time': timezone.now().isoformat(),
+            'route': match.view_name if match else UNRESOLVED,
+            'method': request.method,
+            'path': request.path,
+            'params': {
+                key: values if len(values) > 1 else values[0]
+                for key, values in request.GET.lists()
+            },
+            'status': response.status_code,
+            'duration_ms': to_ms(duration),
+            'sampled': log is not None,
+        }
+        if log is None:
+            return record
+        record['query_count'] = len(log.queries)
+        record['db_ms'] = to_ms(sum(query[3] for query in log.queries))
+        record['queries'] = [
+            {'sql': sql, 'duration_ms': to_ms(elapsed)}
+            for _, sql, _, elapsed in log.queries[
+                :settings.SLOW_REQUEST_MAX_QUERIES
+            ]
+        ]
+        slowest = sorted(
+            (
+                query for query in log.queries
+                if query[2] is not None
+                and query[1].lstrip().upper().startswith('SELECT')
+            ),
+            key=lambda query: query[3],
+            reverse=True,
+        )[:settings.SLOW_REQUEST_EXPLAIN_LIMIT]
+        record['plans'] = [
+            {
+                'sql': sql,
+                'duration_ms': to_ms(elapsed),
+                'plan': explain(alias, sql, params),
+            }
+            for alias, sql, params, elapsed in slowest
+        ]
+        return record
+
+
+class ProfileMiddleware:
+    """
+    Выполняет запрос под cProfile и сохраняет профиль (см. api.profiling),
+    если администратор прислал заголовок X-Profile или запрос попал в долю
+    PROFILE_SAMPLE_RATE. Имя файла профиля возвращается в заголовке
+    X-Profile-Id ответа на запрос с заголовком.
+    """
+    header = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = bool(request.META.get(self.header)) and is_admin_request(
+            request
+        )
+        if not requested and not (
+            random.random() < settings.PROFILE_SAMPLE_RATE
+        ):
+            return self.get_response(request)
+        profile = Profile()
+        response = profile.runcall(self.get_response, request)
+        match = request.resolver_match
+        path = save_profile(profile, match.view_name if match else UNRESOLVED)
+        if requested:
+            response['X-Profile-Id'] = path.name
+        return response
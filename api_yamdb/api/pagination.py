@@ -0,0 +1,39 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная (keyset) пагинация по паре (pub_date, id)."""
+    ordering = ('pub_date', 'id')
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Постраничная пагинация, переключаемая на курсорную.
+
+    Курсорная пагинация включается параметром запроса `cursor` (для первой
+    страницы достаточно `?cursor=`) или атрибутом представления
+    `cursor_pagination = True`. В этом режиме не выполняется COUNT(*), а
+    следующая страница выбирается по индексу, а не через OFFSET.
+    """
+    cursor_pagination_class = PubDateCursorPagination
+
+    def use_cursor(self, request, view):
+        return (
+            getattr(view, 'cursor_pagination', False)
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request, view):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view,
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,78 @@
+"""
+Профилирование отдельных запросов через cProfile.
+
+Профиль сохраняется в PROFILE_DIR файлом .pstats, имя которого содержит
+время (UTC) и маршрут запроса, например
+20240101T120000123456-api.titles-list-1a2b.pstats. Файлы читаются
+pstats, snakeviz и командой profiles.
+"""
+import re
+import secrets
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from api.authentication import CachedJWTAuthentication
+
+PROFILE_SUFFIX = '.pstats'
+TIME_FORMAT = '%Y%m%dT%H%M%S%f'
+PROFILE_NAME = re.compile(
+    r'^(?P<time>\d{8}T\d{12})-(?P<route>.+)-[0-9a-f]{4}$'
+)
+UNSAFE_CHARS = re.compile(r'[^\w.-]')
+
+
+def get_profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+def is_admin_request(request):
+    """
+    Запрос администратора: по сессии или по JWT-токену. Токен проверяется
+    только для запросов с заголовком профилирования.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_admin
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_admin
+
+
+def save_profile(profile, route):
+    """Сохраняет профиль и удаляет самые старые сверх PROFILE_MAX_FILES."""
+    directory = get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    route = UNSAFE_CHARS.sub('_', route.replace(':', '.'))
+    path = directory / (
+        f'{timezone.now().strftime(TIME_FORMAT)}-{route}-'
+        f'{secrets.token_hex(2)}{PROFILE_SUFFIX}'
+    )
+    profile.dump_stats(path)
+    for old in list_profiles()[settings.PROFILE_MAX_FILES:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles():
+    """Файлы профилей, начиная с самых новых."""
+    directory = get_profile_dir()
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f'*{PROFILE_SUFFIX}'), reverse=True)
+
+
+def parse_profile_name(path):
+    """Время и маршрут из имени файла профиля."""
+    match = PROFILE_NAME.match(path.name[:-len(PROFILE_SUFFIX)])
+    if match is None:
+        return None, path.stem
+    return (
+        datetime.strptime(match['time'], TIME_FORMAT),
+        match['route'].replace('.', ':', 1),
+    )
@@ -0,0 +1,44 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Как и JSONRenderer, экранируем разделители строк, чтобы ответ оставался
+# корректным JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Компактный JSON сразу в UTF-8, без экранирования не-ASCII символов.
+
+    Если установлен orjson, сериализация выполняется им; даты, Decimal и
+    ленивые строки по-прежнему преобразует JSONEncoder DRF, поэтому ответ
+    совпадает с JSONRenderer. Отступы (`; indent=N`, browsable API) и
+    данные, которые orjson не поддерживает, рендерит JSONRenderer.
+    """
+    ensure_ascii = False
+    compact = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(
+            accepted_media_type, renderer_context or {},
+        ) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for char, escaped in LINE_SEPARATORS:
+            ret = ret.replace(char, escaped)
+        return ret
@@ -1,14 +1,43 @@
 from django.conf import settings
-from rest_framework.serializers import (CharField, CurrentUserDefault,
+from rest_framework.serializers import (CharField, ChoiceField,
+                                        CurrentUserDefault, DateTimeField,
                                         EmailField, IntegerField,
                                         ModelSerializer, Serializer,
                                         SlugRelatedField, ValidationError)
 
-from api.utils import UsernameValeidationMixin
+from api.utils import UsernameValeidationMixin, get_expand
 from reviews.models import Category, Comment, Genre, Review, Title
 from user.models import User
 
 
+class AutocompleteSerializer(Serializer):
+    """Сериализатор параметров запроса автодополнения."""
+    q = CharField(max_length=settings.MAX_LENGTH_NAME, required=True)
+    limit = IntegerField(
+        min_value=1,
+        max_value=settings.AUTOCOMPLETE_MAX_LIMIT,
+        default=settings.AUTOCOMPLETE_LIMIT,
+    )
+
+
+class ExportSerializer(Serializer):
+    """Сериализатор параметров выгрузки отзывов и комментариев."""
+    export_format = ChoiceField(('ndjson', 'csv'), default='ndjson')
+    title = IntegerField(min_value=1, required=False)
+    author = CharField(
+        max_length=settings.MAX_LENGTH_USERNAME,
+        required=False,
+    )
+    since = DateTimeField(
+        required=False,
+        input_formats=('iso-8601', '%Y-%m-%d'),
+    )
+    until = DateTimeField(
+        required=False,
+        input_formats=('iso-8601', '%Y-%m-%d'),
+    )
+
+
 class CreateUserSerializer(UsernameValeidationMixin, Serializer):
     """Сериализатор данных для создания пользователя."""
     email = EmailField(max_length=settings.MAX_LENGTH_EMAIL, required=True)
@@ -82,7 +111,7 @@ class ModificationTitleSerializer(ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'review_count', 'rating')
 
 
 class ReadTitleSerializer(ModelSerializer):
@@ -93,10 +122,32 @@ class ReadTitleSerializer(ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'review_count')
+
+
+class AuthorSerializer(ModelSerializer):
+    """Краткие сведения об авторе отзыва или комментария."""
 
+    class Meta:
+        model = User
+        fields = ('username', 'role')
+
+
+class ExpandAuthorMixin:
+    """
+    С параметром ?expand=author поле author содержит AuthorSerializer
+    вместо имени пользователя. Автор выбирается через select_related, без
+    запроса на каждый объект.
+    """
 
-class ReviewSerializer(ModelSerializer):
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'author' in get_expand(self.context.get('request')):
+            fields['author'] = AuthorSerializer(read_only=True)
+        return fields
+
+
+class ReviewSerializer(ExpandAuthorMixin, ModelSerializer):
     author = SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -118,7 +169,14 @@ class ReviewSerializer(ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
 
-class CommentSerializer(ModelSerializer):
+class ReviewSearchSerializer(ReviewSerializer):
+    """Сериализатор результатов поиска по отзывам всех произведений."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date')
+
+
+class CommentSerializer(ExpandAuthorMixin, ModelSerializer):
     author = SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from api.authentication import revoke_user
+from api.autocomplete import CATEGORIES, GENRES, TITLES, autocomplete_index
+from api.cache import bump_version, invalidate_catalog
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from user.models import User
+
+
+def on_commit_bump(*parts):
+    transaction.on_commit(lambda: bump_version(*parts))
+
+
+def on_catalog_change(**kwargs):
+    """Сбрасывает кэш каталога после фиксации транзакции."""
+    transaction.on_commit(invalidate_catalog)
+
+
+def on_title_change(instance, **kwargs):
+    on_commit_bump('title', instance.pk)
+
+
+def on_title_genres_change(instance, reverse, **kwargs):
+    if reverse:
+        on_commit_bump('taxonomy')
+    else:
+        on_commit_bump('title', instance.pk)
+
+
+def on_taxonomy_change(**kwargs):
+    on_commit_bump('taxonomy')
+
+
+def on_review_change(instance, **kwargs):
+    on_commit_bump('title', instance.title_id)
+    on_commit_bump('reviews', instance.title_id)
+    on_commit_bump('comments', instance.pk)
+
+
+def on_comment_change(instance, **kwargs):
+    on_commit_bump('comments', instance.review_id)
+
+
+def on_user_change(**kwargs):
+    on_commit_bump('users')
+
+
+def on_user_save(instance, created, **kwargs):
+    """Отзывает токены пользователя при смене роли, прав или активности."""
+    if not created and instance.access_changed():
+        user_id = instance.pk
+        transaction.on_commit(lambda: revoke_user(user_id))
+    instance.remember_access()
+
+
+def on_user_delete(instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user(user_id))
+
+
+AUTOCOMPLETE_KINDS = {Title: TITLES, Genre: GENRES, Category: CATEGORIES}
+
+
+def on_autocomplete_save(sender, instance, **kwargs):
+    """Добавляет или обновляет запись в индексе автодополнения."""
+    if sender is Title:
+        item = {'id': instance.pk, 'name': instance.name,
+                'rating': instance.rating}
+    else:
+        item = {'name': instance.name, 'slug': instance.slug}
+    kind, obj_id = AUTOCOMPLETE_KINDS[sender], instance.pk
+    transaction.on_commit(
+        lambda: autocomplete_index.change('add', kind, obj_id, item)
+    )
+
+
+def on_autocomplete_delete(sender, instance, **kwargs):
+    kind, obj_id = AUTOCOMPLETE_KINDS[sender], instance.pk
+    transaction.on_commit(
+        lambda: autocomplete_index.change('remove', kind, obj_id)
+    )
+
+
+def on_review_rating_change(instance, **kwargs):
+    """Обновляет рейтинг произведения в индексе автодополнения."""
+    title_id = instance.title_id
+
+    def update_rating():
+        rating = Title.objects.filter(id=title_id).values_list(
+            'rating', flat=True,
+        ).first()
+        autocomplete_index.change('update', TITLES, title_id, rating=rating)
+
+    transaction.on_commit(update_rating)
+
+
+for model in (Title, Genre, Category, GenreTitle, Review):
+    post_save.connect(on_catalog_change, sender=model)
+    post_delete.connect(on_catalog_change, sender=model)
+m2m_changed.connect(on_catalog_change, sender=Title.genre.through)
+
+for model, receiver in (
+    (Title, on_title_change),
+    (Genre, on_taxonomy_change),
+    (Category, on_taxonomy_change),
+    (Review, on_review_change),
+    (Comment, on_comment_change),
+    (User, on_user_change),
+):
+    post_save.connect(receiver, sender=model)
+    post_delete.connect(receiver, sender=model)
+m2m_changed.connect(on_title_genres_change, sender=Title.genre.through)
+
+for model in AUTOCOMPLETE_KINDS:
+    post_save.connect(on_autocomplete_save, sender=model)
+    post_delete.connect(on_autocomplete_delete, sender=model)
+post_save.connect(on_user_save, sender=User)
+post_delete.connect(on_user_delete, sender=User)
+post_save.connect(on_review_rating_change, sender=Review)
+post_delete.connect(on_review_rating_change, sender=Review)
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, CreateTokenView,
-                       CreateUserView, GenreViewSet, ReviewViewSet,
-                       TitleViewSet, UsersViewSet)
+from api.views import (AutocompleteView, CategoryViewSet, CommentExportView,
+                       CommentViewSet, CreateTokenView, CreateUserView,
+                       GenreViewSet, ReviewExportView, ReviewSearchViewSet,
+                       ReviewViewSet, TitleViewSet, UsersViewSet)
 
 app_name = 'api'
 
@@ -23,9 +24,19 @@ v1_router.register(
     CommentViewSet,
     basename='comments',
 )
+v1_router.register(
+    'search/reviews',
+    ReviewSearchViewSet,
+    basename='reviews-search',
+)
 
 v1_router.register('users', UsersViewSet, basename='users')
 
+export_urls = [
+    path('reviews/', ReviewExportView.as_view(), name='export-reviews'),
+    path('comments/', CommentExportView.as_view(), name='export-comments'),
+]
+
 auth_urls = [
     path(
         'signup/',
@@ -41,6 +52,8 @@ auth_urls = [
 
 
 urlpatterns = [
+    path('v1/autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
     path('v1/', include(v1_router.urls), name='api-root'),
     path('v1/auth/', include(auth_urls), name='api-authorization'),
+    path('v1/export/', include(export_urls), name='api-export'),
 ]
@@ -1,16 +1,24 @@
 import re
+from contextlib import contextmanager
+from itertools import islice
 
+from rest_framework.fields import DateTimeField
 from rest_framework.filters import SearchFilter
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.serializers import ValidationError
 from rest_framework.viewsets import GenericViewSet
 
+from api.cache import CachedListMixin
 from api.permissions import IsAuthenticatedAndAdminOrReadOnly
 
+# Даты в ISO 8601, как в ответах API; общий экземпляр для выгрузок и
+# быстрых сериализаторов, которые форматируют даты без полей DRF.
+DATETIME = DateTimeField()
 
-class GenreCategoryViewSet(CreateModelMixin, ListModelMixin, DestroyModelMixin,
-                           GenericViewSet):
+
+class GenreCategoryViewSet(CachedListMixin, CreateModelMixin, ListModelMixin,
+                           DestroyModelMixin, GenericViewSet):
     permission_classes = (IsAuthenticatedAndAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
@@ -24,3 +32,42 @@ class UsernameValeidationMixin:
         elif not re.match(r'^[\w.@+-]+\Z', username):
             raise ValidationError('Использованы недопустимые символы.')
         return username
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Отключает auto_now_add у полей модели, чтобы при массовой загрузке
+    сохранялись переданные даты, а не время загрузки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def get_expand(request):
+    """Связанные объекты, запрошенные параметром ?expand=author,..."""
+    if request is None:
+        return frozenset()
+    return frozenset(
+        name.strip()
+        for name in request.query_params.get('expand', '').split(',')
+    )
+
+
+def batched(iterable, size):
+    """Разбивает итератор на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,153 @@
+"""
+Быстрое чтение для list/retrieve: строки выбираются через .values() и
+сразу превращаются в словари ответа, без экземпляров моделей и полей
+сериализаторов DRF. Формат ответа совпадает с сериализаторами из
+api.serializers (см. tests/test_21_values_serializers.py).
+"""
+from collections import defaultdict
+
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from api.utils import DATETIME, get_expand
+from reviews.models import GenreTitle
+
+
+class ValuesSerializer:
+    """
+    Базовый класс: колонки для .values() в fields. Наследники определяют
+    to_representation(rows) - сборку словарей ответа из строк. expand -
+    связанные объекты, запрошенные параметром ?expand=.
+    """
+    fields = ()
+
+    def __init__(self, expand=frozenset()):
+        self.expand = expand
+
+    def get_values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.fields)
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Аналог ReadTitleSerializer."""
+    fields = (
+        'id', 'name', 'year', 'description', 'rating',
+        'category__name', 'category__slug',
+    )
+
+    def get_genres(self, title_ids):
+        """Жанры произведений одним запросом, как prefetch_related."""
+        genres = defaultdict(list)
+        if not title_ids:
+            return genres
+        for title_id, name, slug in GenreTitle.objects.filter(
+            title_id__in=title_ids, genre__isnull=False,
+        ).order_by('genre__name').values_list(
+            'title_id', 'genre__name', 'genre__slug',
+        ):
+            genres[title_id].append({'name': name, 'slug': slug})
+        return genres
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        genres = self.get_genres([row['id'] for row in rows])
+        return [
+            {
+                'id': row['id'],
+                'genre': genres[row['id']],
+                'category': None if row['category__slug'] is None else {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                },
+                'rating': (
+                    None if row['rating'] is None else int(row['rating'])
+                ),
+                'name': row['name'],
+                'year': row['year'],
+                'description': row['description'],
+            }
+            for row in rows
+        ]
+
+
+def get_author(serializer, row):
+    """Имя автора или, с ?expand=author, аналог AuthorSerializer."""
+    if 'author' in serializer.expand:
+        return {
+            'username': row['author__username'],
+            'role': row['author__role'],
+        }
+    return row['author__username']
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Аналог ReviewSerializer."""
+    fields = (
+        'id', 'text', 'author__username', 'author__role', 'score',
+        'pub_date',
+    )
+
+    def to_representation(self, rows):
+        return [
+            {
+                'id': row['id'],
+                'text': row['text'],
+                'author': get_author(self, row),
+                'score': row['score'],
+                'pub_date': DATETIME.to_representation(row['pub_date']),
+            }
+            for row in rows
+        ]
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Аналог CommentSerializer."""
+    fields = ('id', 'author__username', 'author__role', 'text', 'pub_date')
+
+    def to_representation(self, rows):
+        return [
+            {
+                'id': row['id'],
+                'author': get_author(self, row),
+                'text': row['text'],
+                'pub_date': DATETIME.to_representation(row['pub_date']),
+            }
+            for row in rows
+        ]
+
+
+class ValuesReadMixin:
+    """
+    Отдаёт list и retrieve через values_serializer_class, если он задан
+    у представления; иначе работают обычные сериализаторы.
+    """
+    values_serializer_class = None
+
+    def get_values_queryset(self, serializer):
+        return serializer.get_values(
+            self.filter_queryset(self.get_queryset()),
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(get_expand(request))
+        queryset = self.get_values_queryset(serializer)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page),
+            )
+        return Response(serializer.to_representation(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.values_serializer_class is None:
+            return super().retrieve(request, *args, **kwargs)
+        serializer = self.values_serializer_class(get_expand(request))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_values_queryset(serializer),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(request, row)
+        return Response(serializer.to_representation([row])[0])
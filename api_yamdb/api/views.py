@@ -1,34 +1,43 @@
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg, F
+from django.db import transaction
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
+from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from rest_framework.views import APIView
-from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from api.filters import TitleFilter
+from api.authentication import get_access_token, invalidate_cached_user
+from api.autocomplete import autocomplete_index
+from api.cache import CachedListMixin, ConditionalGetMixin, get_version
+from api.export import ExportView
+from api.filters import TitleFilter, TitleOrderingFilter, get_title_facets
+from api.pagination import OptionalCursorPagination
 from api.permissions import (IsAdmin, IsAuthenticatedAndAdminOrReadOnly,
                              IsOwnerOrPrivilegeduserOrReadOnly)
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             CreateUserSerializer, GenreSerializer,
-                             GetTokenSerializer, MeSerializer,
+from api.serializers import (AutocompleteSerializer, CategorySerializer,
+                             CommentSerializer, CreateUserSerializer,
+                             GenreSerializer, GetTokenSerializer, MeSerializer,
                              ModificationTitleSerializer, ReadTitleSerializer,
-                             ReviewSerializer, UsersSerializer)
+                             ReviewSearchSerializer, ReviewSerializer,
+                             UsersSerializer)
 from api.utils import GenreCategoryViewSet
-from reviews.models import Category, Genre, Review, Title
-from user.models import User
+from api.values import (CommentValuesSerializer, ReviewValuesSerializer,
+                        TitleValuesSerializer, ValuesReadMixin)
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import search_reviews
+from user.models import OutgoingEmail, User
 
 
 class CreateUserView(APIView):
     """Представление создания юзера"""
     permission_classes = (AllowAny,)
+    query_budgets = {'post': 5}
 
     def post(self, request):
         serializer = CreateUserSerializer(data=request.data)
@@ -46,15 +55,13 @@ class CreateUserView(APIView):
             username=username,
             email=email,
         )
-        send_mail(
+        OutgoingEmail.objects.create(
+            recipient=email,
             subject='Код подтверждения регистрации',
             message='Используйте для получения токена\n'
                     f'confirmation_code:'
                     f'{default_token_generator.make_token(user)}\n'
                     f'username: {username}\n',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
         )
         return Response(serializer.data, status=HTTP_200_OK)
 
@@ -65,6 +72,7 @@ class CreateTokenView(APIView):
     username.
     """
     permission_classes = (AllowAny,)
+    query_budgets = {'post': 2}
 
     def post(self, request, *args, **kwargs):
         """
@@ -84,10 +92,27 @@ class CreateTokenView(APIView):
                 'Отсутствует обязательное поле или оно некорректно',
             )
             return Response(message, status=HTTP_400_BAD_REQUEST)
-        message = {'token': str(AccessToken.for_user(user))}
+        message = {'token': str(get_access_token(user))}
         return Response(message, status=HTTP_200_OK)
 
 
+class AutocompleteView(APIView):
+    """
+    Автодополнение по началу слов в названиях произведений (по убыванию
+    рейтинга), жанров и категорий: ?q=<префикс>&limit=<N>.
+    """
+    permission_classes = (AllowAny,)
+    query_budgets = {'get': 4}
+
+    def get(self, request):
+        serializer = AutocompleteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(autocomplete_index.search(
+            serializer.validated_data['q'],
+            serializer.validated_data['limit'],
+        ))
+
+
 class UsersViewSet(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UsersSerializer
@@ -96,6 +121,10 @@ class UsersViewSet(ModelViewSet):
     filter_backends = (DjangoFilterBackend, SearchFilter)
     search_fields = ('username',)
     http_method_names = ('get', 'post', 'patch', 'delete',)
+    query_budgets = {
+        'list': 3, 'create': 4, 'retrieve': 2, 'partial_update': 3,
+        'destroy': 16, 'user_get_or_patch_me': 2,
+    }
 
     @action(
         detail=False,
@@ -114,61 +143,185 @@ class UsersViewSet(ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_cached_user(request.user.id)
         return Response(serializer.data, status=HTTP_200_OK)
 
+    def perform_update(self, serializer):
+        serializer.save()
+        invalidate_cached_user(serializer.instance.id)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """
+        Удаляет пользователя и пересчитывает рейтинг произведений, отзывы
+        на которые удаляются вместе с ним.
+        """
+        user_id = instance.id
+        title_ids = list(instance.reviews.values_list('title_id', flat=True))
+        instance.delete()
+        Title.objects.filter(id__in=title_ids).recalculate_rating()
+        transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
 
-class TitleViewSet(ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg(F("reviews__score"))).order_by("name")
+class TitleViewSet(CachedListMixin, ConditionalGetMixin, ValuesReadMixin,
+                   ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre',
+    ).order_by('name')
     serializer_class = ModificationTitleSerializer
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAuthenticatedAndAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
     filterset_fields = ('name', 'year', 'category', 'genre',)
+    # В бюджет списка входят два запроса счётчиков ?facets=true, в бюджет
+    # изменения - замена жанров произведения.
+    query_budgets = {
+        'list': 6, 'retrieve': 4, 'create': 8, 'update': 12,
+        'partial_update': 12, 'destroy': 10,
+    }
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return ReadTitleSerializer
         return ModificationTitleSerializer
 
+    def get_paginated_response(self, data):
+        """
+        Добавляет к странице счётчики по жанрам, категориям и годам для
+        всей отфильтрованной выборки, если передан ?facets=true.
+        """
+        response = super().get_paginated_response(data)
+        facets = self.request.query_params.get('facets', '')
+        if facets.lower() in ('1', 'true', 'yes'):
+            response.data['facets'] = get_title_facets(
+                self.filter_queryset(self.get_queryset()),
+            )
+        return response
+
+    def get_etag_parts(self):
+        """Слепок произведения для ETag: рейтинг и версии записей."""
+        if self.action != 'retrieve':
+            return None
+        title_id = self.get_kwarg_id('pk')
+        if title_id is None:
+            return None
+        rating = Title.objects.filter(id=title_id).values_list(
+            'review_count', 'score_sum',
+        ).first()
+        if rating is None:
+            return None
+        return rating, get_version('title', title_id), get_version('taxonomy')
+
 
 class GenreViewSet(GenreCategoryViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    query_budgets = {'list': 3, 'create': 3, 'destroy': 5}
 
 
 class CategoryViewSet(GenreCategoryViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    query_budgets = {'list': 3, 'create': 3, 'destroy': 5}
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ValuesReadMixin, ModelViewSet):
     """ViewSet для просмотра, создания и редактирования отзывов."""
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     http_method_names = ('get', 'post', 'patch', 'delete')
     permission_classes = (IsOwnerOrPrivilegeduserOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    query_budgets = {
+        'list': 5, 'retrieve': 3, 'create': 7, 'partial_update': 8,
+        'destroy': 9,
+    }
 
     def get_queryset(self):
         """Метод для определения queryset (отзывы только 1 произведения)."""
         title_id = self.kwargs.get('title_id')
         reviews_queryset = get_object_or_404(Title, id=title_id).reviews
-        return reviews_queryset.all()
+        return reviews_queryset.select_related('author')
 
+    def get_etag_parts(self):
+        """Слепок списка отзывов для ETag: счётчики и версии записей."""
+        if self.action != 'list':
+            return None
+        title_id = self.get_kwarg_id('title_id')
+        if title_id is None:
+            return None
+        stats = Review.objects.filter(title_id=title_id).aggregate(
+            count=Count('id'), last_id=Max('id'), last_date=Max('pub_date'),
+        )
+        return (
+            sorted(stats.items()),
+            get_version('title', title_id),
+            get_version('reviews', title_id),
+            get_version('users'),
+        )
+
+    @transaction.atomic
     def perform_create(self, serializer):
         """Метод для добавления доп.инфо при создании нового комментария."""
         title_id = self.kwargs.get('title_id')
         title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        review = serializer.save(author=self.request.user, title=title)
+        Title.objects.filter(id=title.id).change_rating(review.score, 1)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Метод для обновления отзыва вместе с рейтингом произведения."""
+        old_score = serializer.instance.score
+        review = serializer.save()
+        Title.objects.filter(id=review.title_id).change_rating(
+            review.score - old_score, 0,
+        )
 
-class CommentViewSet(ModelViewSet):
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Метод для удаления отзыва вместе с пересчётом рейтинга."""
+        instance.delete()
+        Title.objects.filter(id=instance.title_id).change_rating(
+            -instance.score, -1,
+        )
+
+
+class ReviewSearchViewSet(ListModelMixin, GenericViewSet):
+    """
+    Полнотекстовый поиск по отзывам: ?q=<запрос>, необязательно
+    ?title=<id произведения>. Результаты отсортированы по релевантности.
+    """
+    serializer_class = ReviewSearchSerializer
+    permission_classes = (AllowAny,)
+    query_budgets = {'list': 3}
+
+    def get_queryset(self):
+        queryset = Review.objects.select_related('author')
+        title_id = self.request.query_params.get('title')
+        if title_id:
+            if not title_id.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(title_id=title_id)
+        return search_reviews(
+            queryset, self.request.query_params.get('q', ''),
+        )
+
+
+class CommentViewSet(ConditionalGetMixin, ValuesReadMixin, ModelViewSet):
     """
     ViewSet для просмотра, создания и редактирования
     комментариев к отзывам.
     """
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     http_method_names = ('get', 'post', 'patch', 'delete')
     permission_classes = (IsOwnerOrPrivilegeduserOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    query_budgets = {
+        'list': 5, 'retrieve': 3, 'create': 3, 'partial_update': 5,
+        'destroy': 4,
+    }
 
     def get_review(self):
         """Метод для получения ревью."""
@@ -180,8 +333,62 @@ class CommentViewSet(ModelViewSet):
 
     def get_queryset(self):
         """Метод для определения queryset (комментарии только 1 отзыва.)"""
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
+
+    def get_etag_parts(self):
+        """Слепок списка комментариев для ETag: счётчики и версии записей."""
+        if self.action != 'list':
+            return None
+        review_id = self.get_kwarg_id('reviews_id')
+        title_id = self.get_kwarg_id('title_id')
+        if review_id is None or title_id is None:
+            return None
+        stats = Comment.objects.filter(
+            review_id=review_id, review__title_id=title_id,
+        ).aggregate(
+            count=Count('id'), last_id=Max('id'), last_date=Max('pub_date'),
+        )
+        return (
+            sorted(stats.items()),
+            get_version('comments', review_id),
+            get_version('users'),
+        )
 
     def perform_create(self, serializer):
         """Метод для добавления доп.инфо при создании нового комментария."""
         serializer.save(author=self.request.user, review=self.get_review())
+
+
+class ReviewExportView(ExportView):
+    """
+    Выгрузка всех отзывов: ?export_format=ndjson|csv, необязательные
+    фильтры title, author, since и until (не включая).
+    """
+    basename = 'reviews'
+    queryset = Review.objects.all()
+    title_field = 'title_id'
+    query_budgets = {'get': 2}
+    columns = (
+        ('id', 'id'),
+        ('title', 'title_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )
+
+
+class CommentExportView(ExportView):
+    """Выгрузка всех комментариев с теми же параметрами, что и отзывов."""
+    basename = 'comments'
+    queryset = Comment.objects.all()
+    title_field = 'review__title_id'
+    query_budgets = {'get': 2}
+    columns = (
+        ('id', 'id'),
+        ('title', 'review__title_id'),
+        ('review', 'review_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )
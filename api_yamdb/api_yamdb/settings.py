@@ -28,6 +28,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.SlowRequestMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +38,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfileMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -107,7 +111,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -118,11 +131,101 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'users': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'users',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+JWT_USER_CACHE_ALIAS = 'users'
+JWT_USER_CACHE_TIMEOUT = 300
+# Роль в токене вместо запроса пользователя к БД. Требует, чтобы кэш
+# JWT_USER_CACHE_ALIAS был общим для процессов и не вытеснял записи
+# (см. api.authentication.check_role_claim_cache).
+JWT_ROLE_CLAIM = False
+
+RESPONSE_CACHE_ALIAS = 'default'
+# Версии ETag, кэша каталога и индекса автодополнения хранятся в кэше
+# RESPONSE_CACHE_ALIAS. Без DEBUG сервер работает в нескольких процессах,
+# поэтому этот кэш должен быть общим (Redis, memcached, БД), иначе сервер
+# не запустится (см. api.cache.check_shared_cache).
+SHARED_CACHE_REQUIRED = not DEBUG
+RESPONSE_CACHE_TIMEOUT = 300
+
+EXPORT_CHUNK_SIZE = 2000
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Метрики Prometheus (/metrics): лимит рядов (маршрут, метод) и токен
+# для заголовка Authorization: Bearer; без токена метрики доступны только
+# администраторам, а METRICS_PUBLIC = True открывает их всем.
+METRICS_MAX_ROUTES = 200
+METRICS_TOKEN = None
+METRICS_PUBLIC = False
+
+# Лог медленных запросов (логгер api.slow_requests, JSON-строки): порог
+# времени запроса в секундах (None - лог выключен), порог одного
+# SQL-запроса, доля запросов со сбором SQL, сколько самых медленных
+# SELECT объяснять через EXPLAIN и сколько SQL-запросов записывать.
+SLOW_REQUEST_THRESHOLD = None
+SLOW_QUERY_THRESHOLD = 0.1
+SLOW_REQUEST_SAMPLE_RATE = 0.1
+SLOW_REQUEST_EXPLAIN_LIMIT = 3
+SLOW_REQUEST_MAX_QUERIES = 100
+
+# Проверка бюджетов SQL-запросов маршрутов (query_budgets представлений)
+# в режиме DEBUG: 'warn' - предупреждение в логгер api.query_budget,
+# 'raise' - исключение QueryBudgetExceeded, None - проверка выключена.
+QUERY_BUDGET_ACTION = 'warn'
+
+# Профилирование запросов (cProfile): каталог для .pstats, доля
+# профилируемых запросов и сколько последних профилей хранить.
+# Администратор может запросить профиль заголовком X-Profile: 1.
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_SAMPLE_RATE = 0
+PROFILE_MAX_FILES = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'api.query_budget': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = ((BASE_DIR / 'sent_emails/'))
 DEFAULT_FROM_EMAIL = 'from@example.com'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
 
 MAX_LENGTH_NAME = 256
 MAX_LENGTH_SLUG = 50
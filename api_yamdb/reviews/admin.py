@@ -4,8 +4,10 @@ from reviews.models import Category, Comment, Genre, Review, Title
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'year', 'description', 'category',)
+    list_display = ('pk', 'name', 'year', 'description', 'category',
+                    'rating',)
     list_filter = ('name', 'year', 'genre', 'category',)
+    readonly_fields = ('score_sum', 'review_count', 'rating',)
 
 
 class CategoryAdmn(admin.ModelAdmin):
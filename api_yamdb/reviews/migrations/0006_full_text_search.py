@@ -0,0 +1,110 @@
+# Generated by Django 3.2 on 2026-10-18 10:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+
+# Схема поиска FTS5 на момент миграции: SQL скопирован из reviews.search,
+# чтобы её изменения не меняли результат этой миграции.
+CREATE_SEARCH_SQL = (
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5("
+        "name, content='reviews_title', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert AFTER INSERT ON reviews_title "
+        "BEGIN INSERT INTO reviews_title_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete AFTER DELETE ON reviews_title "
+        "BEGIN INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update "
+        "AFTER UPDATE OF name ON reviews_title "
+        "BEGIN INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO reviews_title_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_review_fts USING fts5("
+        "text, content='reviews_review', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_insert AFTER INSERT ON reviews_review "
+        "BEGIN INSERT INTO reviews_review_fts(rowid, text) VALUES (new.id, new.text); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_delete AFTER DELETE ON reviews_review "
+        "BEGIN INSERT INTO reviews_review_fts(reviews_review_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_update "
+        "AFTER UPDATE OF text ON reviews_review "
+        "BEGIN INSERT INTO reviews_review_fts(reviews_review_fts, rowid, text) "
+        "VALUES ('delete', old.id, old.text); "
+        "INSERT INTO reviews_review_fts(rowid, text) VALUES (new.id, new.text); END"
+    ),
+    "INSERT INTO reviews_review_fts(reviews_review_fts) VALUES ('rebuild')",
+)
+DROP_SEARCH_SQL = (
+    "DROP TRIGGER IF EXISTS reviews_title_fts_insert",
+    "DROP TRIGGER IF EXISTS reviews_title_fts_delete",
+    "DROP TRIGGER IF EXISTS reviews_title_fts_update",
+    "DROP TABLE IF EXISTS reviews_title_fts",
+    "DROP TRIGGER IF EXISTS reviews_review_fts_insert",
+    "DROP TRIGGER IF EXISTS reviews_review_fts_delete",
+    "DROP TRIGGER IF EXISTS reviews_review_fts_update",
+    "DROP TABLE IF EXISTS reviews_review_fts",
+)
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_api_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSearch',
+            fields=[
+                ('review', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.review')),
+                ('text', reviews.models.SearchField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_review_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('name', reviews.models.SearchField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            run_sql(CREATE_SEARCH_SQL), run_sql(DROP_SEARCH_SQL),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db.models import (CASCADE, SET_NULL, CharField, DateTimeField,
-                              ForeignKey, IntegerField, ManyToManyField, Model,
-                              PositiveSmallIntegerField, SlugField, TextField,
+from django.db.models import (CASCADE, DO_NOTHING, SET_NULL, Avg, CharField,
+                              Count, DateTimeField, F, FloatField, ForeignKey,
+                              Index, IntegerField, Lookup, ManyToManyField,
+                              Model, OneToOneField, OuterRef,
+                              PositiveIntegerField, PositiveSmallIntegerField,
+                              QuerySet, SlugField, Subquery, Sum, TextField,
                               UniqueConstraint)
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 from reviews.validators import validate_year_less_now
 from user.models import User
@@ -47,6 +51,42 @@ class Genre(Model):
         return self.name
 
 
+class TitleQuerySet(QuerySet):
+    """QuerySet произведений с операциями над хранимым рейтингом."""
+
+    def change_rating(self, score_delta, count_delta):
+        """
+        Изменяет сумму оценок и число отзывов на заданные величины и
+        пересчитывает средний рейтинг одним UPDATE-запросом.
+        """
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=Cast(score_sum, FloatField()) / NullIf(review_count, 0),
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает хранимый рейтинг по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'),
+        ).order_by().values('title')
+        return self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0,
+            ),
+            rating=Subquery(
+                reviews.annotate(average=Avg('score')).values('average'),
+            ),
+        )
+
+
 class Title(Model):
     """Модель с произведениями."""
     name = CharField('Название', max_length=settings.MAX_LENGTH_NAME)
@@ -68,11 +108,21 @@ class Title(Model):
         through='GenreTitle',
         through_fields=('title', 'genre'),
     )
+    score_sum = PositiveIntegerField('Сумма оценок', default=0)
+    review_count = PositiveIntegerField('Количество отзывов', default=0)
+    rating = FloatField('Рейтинг', null=True, blank=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            Index(fields=('name',), name='title_name_idx'),
+            Index(fields=('rating',), name='title_rating_idx'),
+            Index(fields=('review_count',), name='title_review_count_idx'),
+        )
 
     def __str__(self):
         """Метод строкового представления объекта."""
@@ -81,8 +131,23 @@ class Title(Model):
 
 class GenreTitle(Model):
     """Модель, связующая жанры с произведениями."""
-    title = ForeignKey(Title, on_delete=SET_NULL, null=True)
-    genre = ForeignKey(Genre, on_delete=SET_NULL, null=True)
+    title = ForeignKey(Title, on_delete=SET_NULL, null=True, db_index=False)
+    genre = ForeignKey(Genre, on_delete=SET_NULL, null=True, db_index=False)
+
+    class Meta:
+        # Составные индексы заменяют одиночные индексы внешних ключей:
+        # (genre, title) - для фильтра по жанру, (title, genre) - для
+        # загрузки жанров списка произведений.
+        indexes = (
+            Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx',
+            ),
+            Index(
+                fields=('title', 'genre'),
+                name='genretitle_title_genre_idx',
+            ),
+        )
 
     def __str__(self):
         """Метод строкового представления объекта."""
@@ -123,6 +188,12 @@ class Review(Model):
                 name='unique_author_title',
             ),
         )
+        indexes = (
+            Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         """Метод строкового представления объекта."""
@@ -153,7 +224,67 @@ class Comment(Model):
         verbose_name = ('Комментарий к отзыву')
         verbose_name_plural = ('Комментарии к отзывам')
         ordering = ('pub_date', )
+        indexes = (
+            Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         """Метод строкового представления объекта."""
         return self.text[:15]
+
+
+class SearchField(TextField):
+    """Колонка полнотекстового индекса FTS5."""
+
+
+@SearchField.register_lookup
+class Match(Lookup):
+    """Полнотекстовый поиск: колонка MATCH запрос FTS5."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class TitleSearch(Model):
+    """
+    Полнотекстовый индекс названий произведений (таблица FTS5, см.
+    reviews.search). rank - релевантность совпадения, меньше - лучше.
+    """
+    title = OneToOneField(
+        Title,
+        on_delete=DO_NOTHING,
+        db_column='rowid',
+        db_constraint=False,
+        primary_key=True,
+        related_name='search',
+    )
+    name = SearchField()
+    rank = FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
+
+class ReviewSearch(Model):
+    """Полнотекстовый индекс текстов отзывов (таблица FTS5)."""
+    review = OneToOneField(
+        Review,
+        on_delete=DO_NOTHING,
+        db_column='rowid',
+        db_constraint=False,
+        primary_key=True,
+        related_name='search',
+    )
+    text = SearchField()
+    rank = FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_review_fts'
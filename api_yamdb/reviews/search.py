@@ -0,0 +1,132 @@
+"""
+Полнотекстовый поиск по названиям произведений и текстам отзывов на
+основе SQLite FTS5.
+
+Индексы - внешние (content=) таблицы FTS5, которые синхронизируются с
+основными таблицами триггерами. На других СУБД поиск выполняется через
+icontains.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Индексируемые таблицы: (таблица FTS5, основная таблица, колонка).
+SEARCH_INDEXES = (
+    ('reviews_title_fts', 'reviews_title', 'name'),
+    ('reviews_review_fts', 'reviews_review', 'text'),
+)
+TOKENIZER = 'unicode61 remove_diacritics 2'
+TRIGGERS = {
+    'insert': (
+        'AFTER INSERT ON {table} BEGIN '
+        'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); '
+        'END'
+    ),
+    'delete': (
+        'AFTER DELETE ON {table} BEGIN '
+        "INSERT INTO {fts}({fts}, rowid, {column}) "
+        "VALUES ('delete', old.id, old.{column}); "
+        'END'
+    ),
+    'update': (
+        'AFTER UPDATE OF {column} ON {table} BEGIN '
+        "INSERT INTO {fts}({fts}, rowid, {column}) "
+        "VALUES ('delete', old.id, old.{column}); "
+        'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); '
+        'END'
+    ),
+}
+WORD = re.compile(r'\w+')
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def get_trigger_names(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def create_search_schema(connection):
+    """Создаёт таблицы FTS5 и триггеры синхронизации, если их нет."""
+    with connection.cursor() as cursor:
+        for fts, table, column in SEARCH_INDEXES:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+                f"{column}, content='{table}', content_rowid='id', "
+                f"tokenize='{TOKENIZER}')"
+            )
+            for event, body in TRIGGERS.items():
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS {fts}_{event} '
+                    + body.format(fts=fts, table=table, column=column)
+                )
+
+
+def drop_search_schema(connection):
+    with connection.cursor() as cursor:
+        for fts, _, _ in SEARCH_INDEXES:
+            for event in TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{event}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Заново строит индексы FTS5 по основным таблицам."""
+    connection = connections[using]
+    create_search_schema(connection)
+    with connection.cursor() as cursor:
+        for fts, _, _ in SEARCH_INDEXES:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def ensure_search_schema(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Восстанавливает триггеры после миграций: при пересоздании таблицы
+    (ALTER на SQLite) они удаляются вместе со старой таблицей.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    tables = connection.introspection.table_names()
+    if not all(fts in tables for fts, _, _ in SEARCH_INDEXES):
+        return
+    with connection.cursor() as cursor:
+        existing = get_trigger_names(cursor)
+    expected = {
+        f'{fts}_{event}' for fts, _, _ in SEARCH_INDEXES for event in TRIGGERS
+    }
+    if not expected <= existing:
+        rebuild_search_index(using)
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в безопасный запрос FTS5: каждое
+    слово ищется по префиксу, слова объединяются через AND.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD.findall(text))
+
+
+def search(queryset, text, relation, column):
+    """
+    Фильтрует queryset по полнотекстовому запросу и сортирует по
+    релевантности (bm25).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(**{f'{column}__icontains': text})
+    return queryset.filter(
+        **{f'{relation}__{column}__match': match},
+    ).order_by(f'{relation}__rank', 'id')
+
+
+def search_titles(queryset, text):
+    return search(queryset, text, 'search', 'name')
+
+
+def search_reviews(queryset, text):
+    return search(queryset, text, 'search', 'text')
@@ -1,5 +1,14 @@
 from django.contrib import admin
 
-from user.models import User
+from user.models import OutgoingEmail, User
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'created', 'attempts',
+                    'next_attempt', 'sent')
+    list_filter = ('sent',)
+    search_fields = ('recipient',)
+
 
 admin.site.register(User)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -1,11 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from api.utils import UsernameValeidationMixin
 
 ADMIN = 'admin'
 USER = 'user'
 MODERATOR = 'moderator'
+# Поля, от которых зависят права пользователя и токены с ролью.
+ACCESS_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
 
 
 class User(UsernameValeidationMixin, AbstractUser):
@@ -20,6 +23,31 @@ class User(UsernameValeidationMixin, AbstractUser):
     REQUIRED_FIELDS = ['email']
     USERNAME_FIELDS = 'email'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.remember_access()
+        return user
+
+    def remember_access(self):
+        """Запоминает загруженные значения ACCESS_FIELDS."""
+        self._loaded_access = {
+            name: self.__dict__[name]
+            for name in ACCESS_FIELDS if name in self.__dict__
+        }
+
+    def access_changed(self):
+        """
+        Изменились ли права с загрузки или прошлого сохранения. Для
+        объекта, не загруженного из БД, изменение предполагается.
+        """
+        loaded = getattr(self, '_loaded_access', None)
+        if loaded is None:
+            return True
+        return any(
+            getattr(self, name) != value for name, value in loaded.items()
+        )
+
     @property
     def is_admin(self):
         return self.role == ADMIN or self.is_superuser or self.is_staff
@@ -30,3 +58,32 @@ class User(UsernameValeidationMixin, AbstractUser):
 
     def __str__(self):
         return str(self.username)
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox)."""
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('next_attempt',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent', 'next_attempt'),
+                name='outgoing_email_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
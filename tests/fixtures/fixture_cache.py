@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import caches
+
+from api.autocomplete import autocomplete_index
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Очищает кэши, чтобы данные не переходили между тестами."""
+    for cache in caches.all():
+        cache.clear()
+    autocomplete_index.version = None
+    yield
+    for cache in caches.all():
+        cache.clear()
+    autocomplete_index.version = None
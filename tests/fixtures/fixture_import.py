@@ -0,0 +1,42 @@
+import csv
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+STATIC_DATA = settings.BASE_DIR / 'static' / 'data'
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Копия csv-файлов static/data, которую тест может изменять."""
+    directory = tmp_path / 'data'
+    shutil.copytree(STATIC_DATA, directory)
+    return directory
+
+
+@pytest.fixture
+def edit_csv():
+    """Функция, которая переписывает строки csv-файла: change(rows)."""
+    def edit(path, change):
+        with open(path, encoding='utf8', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            fieldnames = reader.fieldnames
+            rows = change(list(reader))
+        with open(path, 'w', encoding='utf8', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+    return edit
+
+
+@pytest.fixture
+def run_import():
+    """Функция, которая запускает import_csv и возвращает его вывод."""
+    def run(**options):
+        out = StringIO()
+        call_command('import_csv', stdout=out, **options)
+        return out.getvalue()
+    return run
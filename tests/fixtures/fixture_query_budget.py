@@ -0,0 +1,38 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+@pytest.fixture
+def query_budget(settings):
+    """
+    Включает проверку бюджетов SQL-запросов маршрутов: запрос сверх
+    бюджета вызывает QueryBudgetExceeded.
+    """
+    settings.DEBUG = True
+    settings.QUERY_BUDGET_ACTION = 'raise'
+
+
+@pytest.fixture(params=(2, 5, 20))
+def page_size(request, monkeypatch):
+    """Размер страницы списков: бюджет не должен зависеть от него."""
+    for pagination in (PageNumberPagination, CursorPagination):
+        monkeypatch.setattr(pagination, 'page_size', request.param)
+    return request.param
+
+
+@pytest.fixture
+def budget_dataset():
+    """Данные, в которых у списков больше одной полной страницы."""
+    call_command(
+        'generate_data',
+        users=20,
+        categories=3,
+        genres=5,
+        titles=30,
+        reviews=300,
+        comments=300,
+        stdout=StringIO(),
+    )
@@ -109,3 +109,20 @@ def user_client(token_user):
     client = APIClient()
     client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
     return client
+
+
+@pytest.fixture
+def role_claim(settings, tmp_path):
+    """
+    Включает JWT_ROLE_CLAIM с общим кэшем пользователей без вытеснения,
+    которого требует этот режим.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.JWT_USER_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'users-cache'),
+            'OPTIONS': {'MAX_ENTRIES': 100_000},
+        },
+    }
+    settings.JWT_ROLE_CLAIM = True
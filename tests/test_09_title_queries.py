@@ -0,0 +1,48 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+from tests.utils import (DETAIL_QUERIES, LIST_QUERIES,
+                         check_query_count)
+
+TITLES_COUNT = 8
+
+
+@pytest.fixture
+def titles_with_relations():
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(2)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    titles = []
+    for idx in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {idx}',
+            year=2000 + idx,
+            description='Описание',
+            category=categories[idx % 2],
+        )
+        title.genre.set(genres[:idx % 3 + 1])
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('query', (
+        '', '?genre=genre-0', '?category=cat-1', '?genre=genre-2&year=2005',
+    ))
+    def test_01_title_list_queries(self, client, titles_with_relations,
+                                   query):
+        check_query_count(client, f'/api/v1/titles/{query}', LIST_QUERIES)
+
+    def test_02_title_detail_queries(self, client, titles_with_relations):
+        title = titles_with_relations[-1]
+        response = check_query_count(
+            client, f'/api/v1/titles/{title.id}/', DETAIL_QUERIES
+        )
+        assert len(response.json()['genre']) == title.genre.count()
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+REVIEWS_COUNT = 12
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    title = Title.objects.create(name='Фильм', year=2000, description='')
+    for idx in range(REVIEWS_COUNT):
+        author = django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake',
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'review {idx}', score=5,
+        )
+        Comment.objects.create(review=review, author=author, text='comment')
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def collect_pages(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает количество '
+                'объектов.'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_reviews_cursor(self, client, title_with_reviews):
+        url = f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+        ids = self.collect_pages(client, f'{url}?cursor=')
+        assert ids == list(
+            title_with_reviews.reviews.order_by('pub_date', 'id')
+            .values_list('id', flat=True)
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы в порядке (pub_date, id) без повторов.'
+        )
+
+        response = client.get(url)
+        assert response.json()['count'] == REVIEWS_COUNT, (
+            'Проверьте, что без параметра `cursor` используется постраничная '
+            'пагинация.'
+        )
+
+    def test_02_comments_cursor(self, client, title_with_reviews):
+        review = title_with_reviews.reviews.first()
+        url = (
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/{review.id}/'
+            'comments/?cursor='
+        )
+        assert self.collect_pages(client, url) == list(
+            review.comments.values_list('id', flat=True)
+        )
@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import check_role_claim_cache, get_access_token
+
+
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def count_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11AuthCache:
+    url = '/api/v1/users/me/'
+
+    def test_01_user_cached_between_requests(self, user_client):
+        response, first = count_queries(user_client, 'get', self.url)
+        assert response.status_code == HTTPStatus.OK
+        response, second = count_queries(user_client, 'get', self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert second == first - 1, (
+            'Проверьте, что пользователь из JWT-токена берётся из кэша и не '
+            'загружается из БД при каждом запросе.'
+        )
+
+    def test_02_patch_me_invalidates_cache(self, user_client):
+        user_client.get(self.url)
+        response = user_client.patch(self.url, data={'bio': 'new bio'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.url).json()['bio'] == 'new bio', (
+            'Проверьте, что изменение профиля сбрасывает кэш пользователя.'
+        )
+
+    def test_03_admin_patch_and_delete_invalidate_cache(self, admin_client,
+                                                        user, user_client):
+        user_client.get(self.url)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert user_client.get(self.url).json()['role'] == 'moderator'
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удаление пользователя сбрасывает его кэш.'
+        )
+
+    def test_04_role_claim_needs_no_user_query(self, role_claim, admin):
+        client = token_client(get_access_token(admin))
+        response, queries = count_queries(
+            client, 'post', '/api/v1/genres/',
+            data={'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert queries == 2, (
+            'Проверьте, что при JWT_ROLE_CLAIM права администратора '
+            'проверяются по токену без запроса пользователя к БД.'
+        )
+
+    @pytest.mark.parametrize('revoke', ('delete', 'deactivate'))
+    def test_05_role_claim_rejects_revoked_user(self, role_claim, admin,
+                                                revoke):
+        client = token_client(get_access_token(admin))
+        if revoke == 'delete':
+            admin.delete()
+        else:
+            admin.is_active = False
+            admin.save()
+        response = client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что при JWT_ROLE_CLAIM токен удалённого или '
+            'деактивированного пользователя отклоняется.'
+        )
+
+    def test_06_role_claim_demoted_admin(self, role_claim, admin,
+                                         user_superuser):
+        demoted = token_client(get_access_token(admin))
+        superuser = token_client(get_access_token(user_superuser))
+        response = superuser.patch(
+            f'/api/v1/users/{admin.username}/', data={'role': 'user'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = demoted.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что при JWT_ROLE_CLAIM администратор, лишённый '
+            'роли, теряет права со старым токеном.'
+        )
+
+    def test_07_revocation_kept_on_unrelated_save(self, role_claim, admin):
+        client = token_client(get_access_token(admin))
+        admin.is_active = False
+        admin.save()
+        admin.bio = 'new bio'
+        admin.save()
+        response = client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что сохранение других полей не снимает отзыв '
+            'токенов пользователя.'
+        )
+
+    def test_08_new_token_after_revocation(self, role_claim, admin):
+        admin.is_active = False
+        admin.save()
+        admin.is_active = True
+        admin.save()
+        token = get_access_token(admin)
+        # Токен выпущен позже отзыва: отзыв действует с точностью до секунды.
+        token['iat'] += 1
+        response, queries = count_queries(
+            token_client(token), 'post', '/api/v1/genres/',
+            data={'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert queries == 2, (
+            'Проверьте, что токены, выпущенные после отзыва, снова '
+            'проверяются без запроса пользователя к БД.'
+        )
+
+    def test_09_role_claim_requires_shared_cache(self, settings):
+        settings.JWT_ROLE_CLAIM = True
+        with pytest.raises(ImproperlyConfigured):
+            check_role_claim_cache()
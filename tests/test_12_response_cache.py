@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+from tests.utils import check_query_count, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/?genre=horror',
+        '/api/v1/genres/',
+        '/api/v1/categories/?search=Ф',
+    ))
+    def test_01_anonymous_list_cached(self, client, admin_client, url):
+        create_titles(admin_client)
+        first = client.get(url)
+        second = check_query_count(client, url, 0)
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+            'отдаётся из кэша.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?category=films'
+        assert client.get(url).json()['results'][0]['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        assert client.get(url).json()['results'][0]['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        genres = client.get(url).json()['results'][0]['genre']
+        assert [genre['slug'] for genre in genres] == ['drama'], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
+
+        admin_client.delete('/api/v1/genres/drama/')
+        slugs = [
+            genre['slug'] for genre in client.get('/api/v1/genres/').json()[
+                'results'
+            ]
+        ]
+        assert 'drama' not in slugs, (
+            'Проверьте, что удаление жанра сбрасывает кэш списка жанров.'
+        )
+
+    def test_03_authenticated_not_cached(self, admin_client):
+        create_titles(admin_client)
+        admin_client.get('/api/v1/genres/')
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get('/api/v1/genres/')
+        assert context.captured_queries, (
+            'Проверьте, что ответы авторизованным пользователям не кэшируются.'
+        )
+
+    def test_04_cache_key_includes_host(self, client, admin_client,
+                                        monkeypatch):
+        create_titles(admin_client)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 1)
+        url = '/api/v1/titles/'
+        evil = client.get(url, HTTP_HOST='evil.example').json()['next']
+        normal = client.get(url, HTTP_HOST='testserver').json()['next']
+        assert evil.startswith('http://evil.example/'), evil
+        assert normal.startswith('http://testserver/'), (
+            'Проверьте, что ключ кэша ответа учитывает схему и хост: '
+            'ссылки пагинации не должны попадать к клиентам с другим '
+            'заголовком Host.'
+        )
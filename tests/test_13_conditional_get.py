@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import check_shared_cache
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        return etag
+
+    def test_01_etags(self, client, admin_client, admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        for url in (title_url, reviews_url, comments_url):
+            self.check_not_modified(client, url)
+
+    def test_02_not_modified_skips_serialization(self, client, admin_client,
+                                                 admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, _, titles = create_comments(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что при ответе 304 отзывы не загружаются из БД.'
+        )
+
+    def test_03_changes_update_etag(self, client, admin_client, admin, user,
+                                    user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        etags = {
+            url: self.check_not_modified(client, url)
+            for url in (title_url, reviews_url, comments_url)
+        }
+
+        user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'score': 9}
+        )
+        user_client.patch(
+            f'{comments_url}{comments[1]["id"]}/', data={'text': 'edited'}
+        )
+        admin_client.patch(title_url, data={'description': 'new'})
+
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+                'со старым `If-None-Match` возвращает ответ со статусом 200.'
+            )
+
+    def test_04_non_numeric_title_id(self, client):
+        response = client.get('/api/v1/titles/abc/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/abc/` возвращает '
+            'ответ со статусом 404, а не ошибку при расчёте ETag.'
+        )
+
+    def test_05_versions_require_shared_cache(self, settings, tmp_path):
+        with pytest.raises(ImproperlyConfigured):
+            check_shared_cache()
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.RESPONSE_CACHE_ALIAS: {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path / 'cache'),
+            },
+        }
+        check_shared_cache()
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from user.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx):
+        response = client.post(self.url_signup, data={
+            'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}',
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_01_signup_enqueues(self, client):
+        outbox_before_count = len(mail.outbox)
+        self.signup(client, 1)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что регистрация только ставит письмо в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='user1@yamdb.fake', sent__isnull=True,
+        ).exists()
+
+    def test_02_worker_sends_batches(self, client):
+        for idx in range(5):
+            self.signup(client, idx)
+        outbox_before_count = len(mail.outbox)
+        call_command('send_emails', batch_size=2)
+        assert len(mail.outbox) == outbox_before_count + 5
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
+
+        call_command('send_emails')
+        assert len(mail.outbox) == outbox_before_count + 5, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_03_failed_email_retried_with_backoff(self, client):
+        self.signup(client, 1)
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('relay down'),
+        ):
+            call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert 'relay down' in email.last_error
+        assert email.next_attempt > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+
+        outbox_before_count = len(mail.outbox)
+        call_command('send_emails')
+        assert len(mail.outbox) == outbox_before_count
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        call_command('send_emails')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert OutgoingEmail.objects.get().sent is not None
+
+    def test_04_connection_failure_fails_batch(self, client):
+        for idx in range(3):
+            self.signup(client, idx)
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open',
+            side_effect=ConnectionRefusedError('relay down'),
+        ):
+            call_command('send_emails')
+        for email in OutgoingEmail.objects.all():
+            assert email.sent is None
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка соединения считается неудачной '
+                'попыткой для каждого письма пачки.'
+            )
+            assert 'relay down' in email.last_error
+            assert email.next_attempt > timezone.now(), (
+                'Проверьте, что после ошибки соединения отправка '
+                'откладывается.'
+            )
+
+    def test_05_sends_outside_transaction(self, client):
+        self.signup(client, 1)
+        in_transaction = []
+
+        def send(message):
+            in_transaction.append(connection.in_atomic_block)
+            return 1
+
+        with mock.patch('django.core.mail.EmailMessage.send', send):
+            call_command('send_emails')
+        assert in_transaction == [False], (
+            'Проверьте, что письма отправляются вне транзакции, '
+            'блокирующей строки очереди.'
+        )
+        assert OutgoingEmail.objects.get().sent is not None
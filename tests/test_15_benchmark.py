@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.management.commands.benchmark import PERCENTILES
+from reviews.models import Review, Title
+from user.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Benchmark:
+
+    def test_01_generate_data(self):
+        call_command(
+            'generate_data', users=30, categories=2, genres=4, titles=10,
+            reviews=100, comments=50, seed=1,
+        )
+        assert User.objects.count() == 30
+        assert Title.objects.count() == 10
+        assert 0 < Review.objects.count() <= 100
+        counts = sorted(
+            Title.objects.values_list('review_count', flat=True)
+        )
+        assert counts[-1] > counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределяются по произведениям '
+            'неравномерно.'
+        )
+
+    def test_02_benchmark_report_and_baseline(self, tmp_path):
+        call_command(
+            'generate_data', users=20, categories=2, genres=3, titles=5,
+            reviews=40, comments=40, seed=2,
+        )
+        report = tmp_path / 'report.json'
+        call_command('benchmark', repeat=2, warmup=0, output=report)
+        results = json.loads(report.read_text(encoding='utf8'))
+        for name in ('titles-list', 'titles-delete', 'reviews-list',
+                     'reviews-search', 'comments-list', 'comments-update',
+                     'autocomplete', 'export-reviews', 'export-comments',
+                     'users-create', 'users-delete', 'users-me', 'signup',
+                     'token'):
+            endpoint = results['endpoints'][name]
+            for rank in PERCENTILES:
+                assert endpoint[f'p{rank}_ms'] >= 0
+            assert endpoint['queries'] >= 0
+
+        baseline = tmp_path / 'baseline.json'
+        for endpoint in results['endpoints'].values():
+            endpoint['queries'] = 0
+        baseline.write_text(json.dumps(results), encoding='utf8')
+        with pytest.raises(CommandError, match='регрессии'):
+            call_command(
+                'benchmark', repeat=1, warmup=0, baseline=baseline,
+                output=tmp_path / 'next.json',
+            )
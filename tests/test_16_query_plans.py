@@ -0,0 +1,26 @@
+import pytest
+from django.core.management import call_command
+
+from api.management.commands.check_query_plans import find_problems
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16QueryPlans:
+
+    def test_01_api_queries_use_indexes(self):
+        call_command('check_query_plans')
+
+    def test_02_full_scan_detected(self):
+        plan = (
+            '2 0 0 SCAN reviews_title\n'
+            '5 0 0 SEARCH reviews_category USING INTEGER PRIMARY KEY '
+            '(rowid=?) LEFT-JOIN\n'
+            '9 0 0 USE TEMP B-TREE FOR ORDER BY'
+        )
+        assert find_problems(plan, sorted_by_index=True) == [
+            'полный просмотр таблицы reviews_title',
+            'сортировка без индекса',
+        ]
+        assert not find_problems(
+            '2 0 0 SCAN reviews_title USING INDEX title_name_idx', True,
+        )
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+def search_titles(client, query):
+    response = client.get('/api/v1/titles/', {'search': query})
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что GET-запрос к `/api/v1/titles/?search=` возвращает '
+        'ответ со статусом 200.'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Search:
+
+    def test_01_title_search(self, admin_client):
+        create_titles(admin_client)
+        assert search_titles(admin_client, 'терминат') == ['Терминатор'], (
+            'Проверьте, что `?search=` ищет произведения по началу слова '
+            'в названии без учёта регистра.'
+        )
+        assert search_titles(admin_client, 'КРЕПКИЙ орешек') == [
+            'Крепкий орешек'
+        ], 'Проверьте, что `?search=` ищет по всем словам запроса.'
+        assert search_titles(admin_client, 'орешек "OR*') == [], (
+            'Проверьте, что `?search=` требует совпадения всех слов и '
+            'не падает на синтаксисе FTS5 в запросе.'
+        )
+        assert search_titles(admin_client, '!?') == [], (
+            'Проверьте, что запрос `?search=` без слов ничего не находит.'
+        )
+
+    def test_02_title_search_ranking(self, admin_client):
+        create_titles(admin_client)
+        Title.objects.create(
+            name='Охотник на терминатора и другие истории',
+            year=1991,
+            description='',
+        )
+        names = search_titles(admin_client, 'терминатор')
+        assert names == [
+            'Терминатор', 'Охотник на терминатора и другие истории',
+        ], (
+            'Проверьте, что результаты `?search=` отсортированы по '
+            'релевантности.'
+        )
+
+    def test_03_index_follows_changes(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'name': 'Хищник'},
+        )
+        assert search_titles(admin_client, 'терминатор') == [], (
+            'Проверьте, что после изменения названия старое название не '
+            'находится.'
+        )
+        assert search_titles(admin_client, 'хищник') == ['Хищник'], (
+            'Проверьте, что после изменения названия находится новое.'
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert search_titles(admin_client, 'хищник') == [], (
+            'Проверьте, что удалённое произведение не находится.'
+        )
+
+    def test_04_review_search(self, client, admin_client, user_client,
+                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(
+            user_client, titles[0]['id'], 'Отличные спецэффекты', 9,
+        )
+        create_single_review(
+            moderator_client, titles[0]['id'], 'Скучный сюжет', 3,
+        )
+        create_single_review(
+            user_client, titles[1]['id'], 'Сюжет держит в напряжении', 8,
+        )
+        url = '/api/v1/search/reviews/'
+        response = client.get(url, {'q': 'сюжет'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` доступен без токена.'
+        )
+        results = response.json()['results']
+        assert {review['text'] for review in results} == {
+            'Скучный сюжет', 'Сюжет держит в напряжении',
+        }, f'Проверьте, что `{url}?q=` ищет по тексту отзывов.'
+        assert set(results[0]) == {
+            'id', 'title', 'text', 'author', 'score', 'pub_date',
+        }
+        results = client.get(
+            url, {'q': 'сюжет', 'title': titles[1]['id']},
+        ).json()['results']
+        assert [review['title'] for review in results] == [titles[1]['id']], (
+            f'Проверьте, что `{url}?title=` ограничивает поиск одним '
+            'произведением.'
+        )
+        Review.objects.filter(text='Скучный сюжет').update(text='Скучно')
+        results = client.get(url, {'q': 'сюжет'}).json()['results']
+        assert len(results) == 1, (
+            'Проверьте, что индекс отзывов обновляется при изменении текста.'
+        )
+
+    def test_05_rebuild_command(self, admin_client):
+        create_titles(admin_client)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO reviews_title_fts(reviews_title_fts) "
+                "VALUES ('delete-all')"
+            )
+        assert search_titles(admin_client, 'терминатор') == []
+        call_command('rebuild_search_index')
+        assert search_titles(admin_client, 'терминатор') == ['Терминатор'], (
+            'Проверьте, что команда rebuild_search_index восстанавливает '
+            'полнотекстовый индекс.'
+        )
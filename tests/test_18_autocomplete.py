@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.autocomplete import (PrefixIndex, invalidate_autocomplete,
+                              iter_keys, title_order)
+from reviews.models import Title
+from tests.utils import check_query_count, create_single_review, create_titles
+
+URL = '/api/v1/autocomplete/'
+
+
+def autocomplete(client, query, **params):
+    response = client.get(URL, {'q': query, **params})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}?q=` возвращает ответ со '
+        'статусом 200.'
+    )
+    return response.json()
+
+
+def names(data, kind):
+    return [item['name'] for item in data[kind]]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Autocomplete:
+
+    def test_01_prefix_search(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        data = autocomplete(client, 'ОРЕ')
+        assert names(data, 'titles') == ['Крепкий орешек'], (
+            'Проверьте, что автодополнение находит произведение по началу '
+            'любого слова названия без учёта регистра.'
+        )
+        assert set(data['titles'][0]) == {'id', 'name', 'rating'}
+        genre = genres[0]
+        data = autocomplete(client, genre['name'][:3])
+        assert genre in data['genres'], (
+            'Проверьте, что автодополнение возвращает жанры с name и slug.'
+        )
+        category = categories[0]
+        data = autocomplete(client, category['name'][:2].lower())
+        assert category in data['categories'], (
+            'Проверьте, что автодополнение возвращает категории.'
+        )
+        assert autocomplete(client, 'zzz') == {
+            'titles': [], 'genres': [], 'categories': [],
+        }
+
+    def test_02_validation(self, client):
+        assert client.get(URL).status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{URL}` без `q` возвращает 400.'
+        )
+        response = client.get(URL, {'q': 'а', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_ordering_by_rating(self, client, admin_client, user_client):
+        for idx in range(3):
+            Title.objects.create(
+                name=f'Матрица {idx}', year=1999, description='',
+            )
+        best = Title.objects.get(name='Матрица 1')
+        assert len(autocomplete(client, 'матр', limit=2)['titles']) == 2, (
+            'Проверьте, что параметр `limit` ограничивает число результатов.'
+        )
+        create_single_review(user_client, best.id, 'text', 9)
+        data = autocomplete(client, 'матр', limit=2)
+        assert data['titles'][0] == {
+            'id': best.id, 'name': 'Матрица 1', 'rating': 9,
+        }, (
+            'Проверьте, что произведения в автодополнении упорядочены по '
+            'рейтингу и рейтинг обновляется после нового отзыва.'
+        )
+
+    def test_04_served_from_memory(self, client, admin_client):
+        create_titles(admin_client)
+        autocomplete(client, 'тер')
+        check_query_count(client, f'{URL}?q=кре', 0)
+
+    def test_05_index_follows_writes(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        autocomplete(client, 'тер')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Хищник'},
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Хоррор', 'slug': 'horror-2'},
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        data = autocomplete(client, 'х')
+        assert names(data, 'titles') == ['Хищник'], (
+            'Проверьте, что индекс автодополнения обновляется при '
+            'изменении произведения.'
+        )
+        assert 'Хоррор' in names(data, 'genres')
+        assert autocomplete(client, 'тер')['titles'] == []
+        assert genres[0] not in autocomplete(
+            client, genres[0]['name'],
+        )['genres'], 'Проверьте, что удалённый жанр пропадает из индекса.'
+
+    def test_06_bulk_writes_rebuild(self, client, admin_client):
+        create_titles(admin_client)
+        autocomplete(client, 'тер')
+        Title.objects.bulk_create([
+            Title(name='Терминал', year=2004, description=''),
+        ])
+        assert names(autocomplete(client, 'терминал'), 'titles') == []
+        invalidate_autocomplete()
+        assert names(autocomplete(client, 'терминал'), 'titles') == [
+            'Терминал'
+        ], (
+            'Проверьте, что после invalidate_autocomplete индекс '
+            'перестраивается.'
+        )
+
+    def test_07_prefix_index_strategies(self):
+        words = ('альфа', 'бета', 'гамма', 'альт', 'бег')
+        items = {
+            idx: {
+                'id': idx,
+                'name': f'{words[idx % 5]} {words[idx * 3 % 5]}',
+                'rating': None if idx % 4 == 0 else idx % 10,
+            }
+            for idx in range(1, 60)
+        }
+        index = PrefixIndex(title_order, items.items())
+        index.update(7, rating=10)
+        index.remove(8)
+        items[7]['rating'] = 10
+        del items[8]
+        for prefix in ('а', 'аль', 'альф', 'бе', 'гамма бета', 'я'):
+            expected = sorted(
+                (
+                    item for item in items.values()
+                    if any(
+                        key.startswith(prefix)
+                        for key in iter_keys(item['name'])
+                    )
+                ),
+                key=lambda item: (title_order(item), item['id']),
+            )[:5]
+            assert index.find(prefix, 5) == expected, (
+                'Проверьте, что PrefixIndex.find возвращает первые limit '
+                f'совпадений в порядке выдачи (префикс `{prefix}`).'
+            )
@@ -0,0 +1,57 @@
+import pytest
+
+from reviews.models import Title
+from tests.utils import LIST_QUERIES, check_query_count, create_titles
+
+# Жанры и пары (категория, год) считаются двумя группирующими запросами.
+FACETS_QUERIES = 2
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Facets:
+
+    def test_01_facets_counts(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        Title.objects.create(name='Без категории', year=1984, description='')
+        response = client.get('/api/v1/titles/', {'facets': 'true'})
+        facets = response.json()['facets']
+        assert facets == {
+            'genre': {genres[0]['slug']: 1, genres[1]['slug']: 1,
+                      genres[2]['slug']: 1},
+            'category': {categories[0]['slug']: 1, categories[1]['slug']: 1},
+            'year': {'1984': 2, '1988': 1},
+        }, (
+            'Проверьте, что `?facets=true` возвращает количество '
+            'произведений по жанрам, категориям и годам.'
+        )
+
+    def test_02_facets_follow_filters(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        response = client.get(
+            '/api/v1/titles/',
+            {'facets': '1', 'genre': genres[0]['slug']},
+        )
+        data = response.json()
+        assert data['facets'] == {
+            'genre': {genres[0]['slug']: 1, genres[1]['slug']: 1},
+            'category': {categories[0]['slug']: 1},
+            'year': {'1984': 1},
+        }, (
+            'Проверьте, что счётчики `facets` считаются по отфильтрованной '
+            'выборке, а не по странице и не по всему каталогу.'
+        )
+        assert len(data['results']) == data['count'] == 1
+
+    def test_03_facets_optional(self, client, admin_client):
+        create_titles(admin_client)
+        assert 'facets' not in client.get('/api/v1/titles/').json(), (
+            'Проверьте, что `facets` возвращается только по запросу.'
+        )
+
+    def test_04_facets_queries(self, client, admin_client):
+        _, _, genres = create_titles(admin_client)
+        for query in ('?facets=true', f'?facets=true&genre={genres[0]["slug"]}'):
+            check_query_count(
+                client, f'/api/v1/titles/{query}',
+                LIST_QUERIES + FACETS_QUERIES,
+            )
@@ -0,0 +1,55 @@
+import pytest
+
+from reviews.models import Title
+from tests.utils import (LIST_QUERIES, check_query_count,
+                         create_single_review, create_titles)
+
+
+def ordered_names(client, ordering, **params):
+    response = client.get(
+        '/api/v1/titles/', {'ordering': ordering, **params},
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.fixture
+def rated_titles(admin_client, user_client, moderator_client):
+    titles, _, _ = create_titles(admin_client)
+    Title.objects.create(name='Без отзывов', year=2000, description='')
+    create_single_review(user_client, titles[0]['id'], 'text', 4)
+    create_single_review(user_client, titles[1]['id'], 'text', 9)
+    create_single_review(moderator_client, titles[1]['id'], 'text', 7)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleOrdering:
+
+    @pytest.mark.parametrize('ordering, expected', (
+        ('-rating', ['Крепкий орешек', 'Терминатор', 'Без отзывов']),
+        ('year', ['Терминатор', 'Крепкий орешек', 'Без отзывов']),
+        ('-year', ['Без отзывов', 'Крепкий орешек', 'Терминатор']),
+        ('-review_count', ['Крепкий орешек', 'Терминатор', 'Без отзывов']),
+        ('name', ['Без отзывов', 'Крепкий орешек', 'Терминатор']),
+    ))
+    def test_01_ordering(self, client, rated_titles, ordering, expected):
+        assert ordered_names(client, ordering) == expected, (
+            f'Проверьте, что `?ordering={ordering}` сортирует произведения.'
+        )
+
+    def test_02_ordering_with_filter(self, client, rated_titles):
+        genre = Title.objects.get(name='Терминатор').genre.first()
+        Title.objects.get(name='Без отзывов').genre.add(genre)
+        assert ordered_names(client, '-rating', genre=genre.slug) == [
+            'Терминатор', 'Без отзывов',
+        ], 'Проверьте, что `ordering` сочетается с фильтрами.'
+
+    def test_03_unknown_field_ignored(self, client, rated_titles):
+        assert ordered_names(client, 'description') == ordered_names(
+            client, 'name',
+        ), 'Проверьте, что сортировка по неразрешённому полю игнорируется.'
+
+    def test_04_ordering_queries(self, client, rated_titles):
+        check_query_count(
+            client, '/api/v1/titles/?ordering=-rating', LIST_QUERIES,
+        )
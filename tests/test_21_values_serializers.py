@@ -0,0 +1,80 @@
+import pytest
+
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from reviews.models import Review, Title
+from tests.utils import (DETAIL_QUERIES, LIST_QUERIES, check_query_count,
+                         create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.fixture
+def catalog(admin_client, user_client, moderator_client):
+    titles, _, _ = create_titles(admin_client)
+    Title.objects.create(name='Без категории', year=2001, description='')
+    title_id = titles[0]['id']
+    review_ids = [
+        create_single_review(client, title_id, text, score).json()['id']
+        for client, text, score in (
+            (user_client, 'Первый "отзыв" ✓', 8),
+            (moderator_client, 'Второй\nотзыв', 7),
+        )
+    ]
+    comment_ids = [
+        create_single_comment(client, title_id, review_ids[0], text).json()[
+            'id'
+        ]
+        for client, text in (
+            (user_client, 'Комментарий'), (admin_client, 'Ещё один'),
+        )
+    ]
+    reviews = f'/api/v1/titles/{title_id}/reviews/'
+    comments = f'{reviews}{review_ids[0]}/comments/'
+    return (
+        '/api/v1/titles/',
+        '/api/v1/titles/?genre=drama&ordering=-rating',
+        '/api/v1/titles/?search=терминатор&facets=true',
+        '/api/v1/titles/?page=2',
+        f'/api/v1/titles/{title_id}/',
+        f'/api/v1/titles/{Title.objects.get(name="Без категории").id}/',
+        reviews,
+        f'{reviews}?cursor=',
+        f'{reviews}?expand=author',
+        f'{reviews}{review_ids[1]}/',
+        f'{reviews}{review_ids[1]}/?expand=author',
+        comments,
+        f'{comments}?cursor=',
+        f'{comments}?cursor=&expand=author',
+        f'{comments}{comment_ids[1]}/',
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ValuesSerializers:
+
+    def test_01_same_bytes_as_serializers(self, user_client, catalog,
+                                          monkeypatch):
+        fast = [user_client.get(url) for url in catalog]
+        for viewset in (TitleViewSet, ReviewViewSet, CommentViewSet):
+            monkeypatch.setattr(viewset, 'values_serializer_class', None)
+        for url, response in zip(catalog, fast):
+            expected = user_client.get(url)
+            assert response.status_code == expected.status_code
+            assert response.content == expected.content, (
+                f'Проверьте, что быстрое чтение `{url}` через .values() '
+                'отдаёт побайтно тот же ответ, что и сериализаторы DRF.'
+            )
+
+    def test_02_queries(self, user_client, catalog):
+        check_query_count(user_client, catalog[0], LIST_QUERIES)
+        check_query_count(user_client, catalog[4], DETAIL_QUERIES)
+
+    def test_03_non_numeric_pk(self, user_client, catalog):
+        review = Review.objects.order_by('id').first()
+        reviews = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments = f'{reviews}{review.id}/comments/'
+        for url in (f'{reviews}abc/', f'{comments}abc/'):
+            response = user_client.get(url)
+            assert response.status_code == 404, (
+                f'Проверьте, что GET-запрос к `{url}` с нечисловым id '
+                'возвращает ответ со статусом 404.'
+            )
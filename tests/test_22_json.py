@@ -0,0 +1,84 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+import api.parsers
+import api.renderers
+from api.renderers import FastJSONRenderer
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture(params=(True, False), ids=('orjson', 'stdlib'))
+def json_library(request, monkeypatch):
+    """Прогоняет тест с orjson и без него."""
+    if not request.param:
+        monkeypatch.setattr(api.renderers, 'orjson', None)
+        monkeypatch.setattr(api.parsers, 'orjson', None)
+    return request.param
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22JSON:
+
+    def test_01_same_output_as_json_renderer(self, user_client, admin_client,
+                                             json_library):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(
+            user_client, titles[0]['id'], 'Отзыв с "кавычками"', 7,
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for url in ('/api/v1/titles/?facets=true', reviews_url):
+            response = user_client.get(url)
+            assert response.content == JSONRenderer().render(
+                response.data,
+            ), (
+                f'Проверьте, что ответ `{url}` совпадает с выводом '
+                'JSONRenderer.'
+            )
+        assert 'кавычками'.encode() in user_client.get(reviews_url).content, (
+            'Проверьте, что кириллица выводится в UTF-8 без \\uXXXX.'
+        )
+        assert b' ' not in user_client.get('/api/v1/genres/').content, (
+            'Проверьте, что JSON выводится без отступов и пробелов.'
+        )
+
+    def test_02_indent(self, json_library):
+        content = FastJSONRenderer().render(
+            {'a': [1]}, 'application/json; indent=2',
+        )
+        assert content == b'{\n  "a": [\n    1\n  ]\n}'
+
+    def test_03_parser(self, admin_client, json_library):
+        response = admin_client.post(
+            '/api/v1/genres/',
+            data='{"name": "Драма", "slug": "drama-2"}',
+            content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что API принимает тело запроса в JSON.'
+        )
+        response = admin_client.post(
+            '/api/v1/genres/',
+            data='{"name": ',
+            content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный JSON возвращает 400.'
+        )
+
+    def test_04_benchmark_command(self):
+        call_command(
+            'generate_data', users=10, categories=2, genres=3, titles=5,
+            reviews=20, comments=0, seed=3,
+        )
+        out = StringIO()
+        call_command('benchmark_json', size=5, repeat=2, stdout=out)
+        output = out.getvalue()
+        for line in ('titles render fast', 'reviews parse fast'):
+            assert line in output, (
+                'Проверьте, что benchmark_json замеряет рендеринг и разбор '
+                'страниц произведений и отзывов.'
+            )
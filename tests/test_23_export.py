@@ -0,0 +1,123 @@
+import csv
+import json
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Review
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+REVIEWS_URL = '/api/v1/export/reviews/'
+COMMENTS_URL = '/api/v1/export/comments/'
+
+
+def export(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос администратора к `{url}` возвращает '
+        'ответ со статусом 200.'
+    )
+    assert response.streaming, (
+        f'Проверьте, что `{url}` отдаёт ответ через StreamingHttpResponse.'
+    )
+    return response, b''.join(response.streaming_content).decode()
+
+
+def read_ndjson(content):
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.fixture
+def reviews(admin_client, user_client, moderator_client, user, moderator):
+    titles, _, _ = create_titles(admin_client)
+    first = create_single_review(
+        user_client, titles[0]['id'], 'Отзыв, с запятой\nи строкой', 8,
+    ).json()
+    second = create_single_review(
+        moderator_client, titles[1]['id'], 'Второй', 6,
+    ).json()
+    create_single_comment(user_client, titles[0]['id'], first['id'], 'Ком')
+    Review.objects.filter(id=second['id']).update(
+        pub_date=timezone.now() - timedelta(days=10),
+    )
+    return titles, first, second
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Export:
+
+    @pytest.mark.parametrize('url', (REVIEWS_URL, COMMENTS_URL))
+    def test_01_admin_only(self, client, user_client, moderator_client, url):
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        for api_client in (user_client, moderator_client):
+            assert api_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{url}` доступен только администратору.'
+            )
+
+    def test_02_reviews_ndjson(self, admin_client, reviews, user):
+        titles, first, second = reviews
+        response, content = export(admin_client, REVIEWS_URL)
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = read_ndjson(content)
+        assert [row['id'] for row in rows] == [first['id'], second['id']]
+        assert rows[0] == {
+            'id': first['id'],
+            'title': titles[0]['id'],
+            'author': user.username,
+            'text': first['text'],
+            'score': 8,
+            'pub_date': first['pub_date'],
+        }, 'Проверьте поля строки выгрузки отзывов в NDJSON.'
+
+    def test_03_reviews_csv(self, admin_client, reviews):
+        _, first, _ = reviews
+        response, content = export(
+            admin_client, REVIEWS_URL, export_format='csv',
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'attachment' in response['Content-Disposition']
+        rows = list(csv.reader(StringIO(content)))
+        assert rows[0] == [
+            'id', 'title', 'author', 'text', 'score', 'pub_date',
+        ]
+        assert len(rows) == 3
+        assert rows[1][3] == first['text'], (
+            'Проверьте, что CSV корректно экранирует запятые и переводы '
+            'строк.'
+        )
+        response = admin_client.get(
+            REVIEWS_URL, {'export_format': 'csv'}, HTTP_ACCEPT='text/csv',
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_filters(self, admin_client, reviews, moderator):
+        titles, first, second = reviews
+        for params, expected in (
+            ({'title': titles[1]['id']}, [second['id']]),
+            ({'author': moderator.username}, [second['id']]),
+            ({'since': (timezone.now() - timedelta(days=1)).isoformat()},
+             [first['id']]),
+            ({'until': (timezone.now() - timedelta(days=1)).date()},
+             [second['id']]),
+        ):
+            _, content = export(admin_client, REVIEWS_URL, **params)
+            assert [row['id'] for row in read_ndjson(content)] == expected, (
+                f'Проверьте фильтр выгрузки отзывов {params}.'
+            )
+        response = admin_client.get(REVIEWS_URL, {'export_format': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_comments(self, admin_client, reviews, user):
+        titles, first, _ = reviews
+        _, content = export(admin_client, COMMENTS_URL, title=titles[0]['id'])
+        rows = read_ndjson(content)
+        assert len(rows) == 1
+        assert rows[0]['review'] == first['id']
+        assert rows[0]['title'] == titles[0]['id']
+        assert rows[0]['author'] == user.username
+        _, content = export(admin_client, COMMENTS_URL, title=titles[1]['id'])
+        assert content == ''
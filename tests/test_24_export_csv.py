@@ -0,0 +1,64 @@
+import csv
+import gzip
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from api.management.commands.import_csv import TABLES
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from user.models import User
+
+STATIC_DATA = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_csv(path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf8', newline='') as csvfile:
+        return list(csv.reader(csvfile))
+
+
+def clear_database():
+    for model in (Comment, Review, GenreTitle, Title, Genre, Category, User):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ExportCsv:
+
+    def test_01_export_format(self, tmp_path):
+        call_command('import_csv')
+        call_command('export_csv', data_dir=tmp_path)
+        for filename, model, columns, _ in TABLES:
+            exported = read_csv(tmp_path / filename)
+            source = read_csv(STATIC_DATA / filename)
+            assert exported[0] == list(columns), (
+                f'Проверьте заголовок {filename}: колонки должны совпадать '
+                'с теми, что читает import_csv.'
+            )
+            assert len(exported) - 1 == model.objects.count()
+            assert [row[0] for row in exported[1:]] == sorted(
+                (row[0] for row in source[1:]), key=int,
+            ), f'Проверьте, что {filename} содержит все записи.'
+
+    def test_02_round_trip_gzip(self, tmp_path):
+        call_command('import_csv')
+        Title.objects.filter(id=1).update(description='Описание, "в кавычках"')
+        first, second = tmp_path / 'first', tmp_path / 'second'
+        call_command('export_csv', data_dir=first, gzip=True)
+        assert (first / 'review.csv.gz').exists(), (
+            'Проверьте, что с --gzip файлы сжимаются в *.csv.gz.'
+        )
+        clear_database()
+        call_command('import_csv', data_dir=first)
+        assert Title.objects.get(id=1).description == (
+            'Описание, "в кавычках"'
+        )
+        call_command('export_csv', data_dir=second, chunk_size=7)
+        for filename, *_ in TABLES:
+            assert read_csv(first / f'{filename}.gz') == read_csv(
+                second / filename,
+            ), (
+                f'Проверьте, что {filename} после выгрузки и повторной '
+                'загрузки не меняется.'
+            )
@@ -0,0 +1,109 @@
+import csv
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.management.commands.import_csv import Checkpoint, Command
+from reviews.models import Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ImportIncremental:
+
+    def test_01_incremental_updates_changed_rows(self, data_dir, edit_csv,
+                                                 run_import):
+        run_import(data_dir=data_dir)
+        reviews = Review.objects.count()
+        review = Review.objects.order_by('id').first()
+
+        def change_review(rows):
+            rows[0]['text'] = 'Новый текст'
+            rows[0]['score'] = '1'
+            return rows
+
+        def add_genre(rows):
+            return rows + [{'id': '100', 'name': 'Новый', 'slug': 'new'}]
+
+        edit_csv(data_dir / 'review.csv', change_review)
+        edit_csv(data_dir / 'genre.csv', add_genre)
+        with CaptureQueriesContext(connection) as context:
+            output = run_import(data_dir=data_dir, incremental=True)
+        assert (
+            f'review.csv: добавлено 0, обновлено 1, без изменений '
+            f'{reviews - 1}, пропущено 0'
+        ) in output, (
+            'Проверьте, что в режиме --incremental обновляются только '
+            'изменившиеся строки.'
+        )
+        assert 'genre.csv: добавлено 1, обновлено 0' in output
+        review.refresh_from_db()
+        assert (review.text, review.score) == ('Новый текст', 1)
+        assert Genre.objects.filter(slug='new').exists()
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_review"')
+        ]
+        assert len(updates) == 1, (
+            'Проверьте, что изменившиеся строки пачки обновляются одним '
+            'запросом.'
+        )
+        title = Title.objects.get(id=review.title_id)
+        assert title.score_sum == sum(
+            title.reviews.values_list('score', flat=True)
+        ), 'Проверьте, что после импорта рейтинг пересчитывается.'
+
+    def test_02_checkpoint_resume(self, data_dir, tmp_path, monkeypatch,
+                                  run_import):
+        checkpoint_path = tmp_path / 'import.checkpoint'
+        with open(data_dir / 'review.csv', encoding='utf8') as csvfile:
+            total = sum(1 for _ in csv.DictReader(csvfile))
+        insert_batch = Command.insert_batch
+        calls = {'review': 0}
+
+        def failing_insert(self, model, objects, batch_size):
+            if model is Review:
+                calls['review'] += 1
+                if calls['review'] == 3:
+                    raise RuntimeError('Импорт прерван')
+            insert_batch(self, model, objects, batch_size)
+
+        monkeypatch.setattr(Command, 'insert_batch', failing_insert)
+        with pytest.raises(RuntimeError):
+            run_import(
+                data_dir=data_dir, checkpoint=checkpoint_path, batch_size=5,
+            )
+        state = json.loads(checkpoint_path.read_text(encoding='utf8'))
+        assert state['review.csv']['rows'] == 10, (
+            'Проверьте, что checkpoint хранит число зафиксированных строк.'
+        )
+        assert Review.objects.count() == 10, (
+            'Проверьте, что с --checkpoint каждая пачка фиксируется.'
+        )
+
+        monkeypatch.setattr(Command, 'insert_batch', insert_batch)
+        output = run_import(
+            data_dir=data_dir, checkpoint=checkpoint_path, batch_size=5,
+        )
+        assert 'users.csv: обработано 0' in output, (
+            'Проверьте, что уже загруженные файлы при продолжении '
+            'пропускаются.'
+        )
+        assert f'review.csv: обработано {total - 10}' in output, (
+            'Проверьте, что импорт продолжается с места остановки.'
+        )
+        assert Review.objects.count() == total
+        assert not checkpoint_path.exists(), (
+            'Проверьте, что после успешного импорта checkpoint удаляется.'
+        )
+
+    def test_03_checkpoint_ignores_changed_file(self, data_dir, tmp_path):
+        path = data_dir / 'genre.csv'
+        checkpoint = Checkpoint(tmp_path / 'checkpoint')
+        checkpoint.save(path, 5)
+        assert Checkpoint(tmp_path / 'checkpoint').get_position(path) == 5
+        path.write_text(path.read_text(encoding='utf8') + '\n', 'utf8')
+        assert Checkpoint(tmp_path / 'checkpoint').get_position(path) == 0, (
+            'Проверьте, что позиция не используется, если файл изменился.'
+        )
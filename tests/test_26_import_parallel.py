@@ -0,0 +1,71 @@
+import csv
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+def snapshot():
+    return {
+        model._meta.model_name: list(model.objects.order_by('id').values())
+        for model in (Title, Review, Comment)
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ImportParallel:
+
+    def test_01_workers_match_single_process(self, data_dir, run_import):
+        run_import(data_dir=data_dir, batch_size=7)
+        expected = snapshot()
+        for model in (Comment, Review, Title):
+            model.objects.all().delete()
+        output = run_import(data_dir=data_dir, batch_size=7, workers=2)
+        assert 'пропущено 0' in output
+        assert snapshot() == expected, (
+            'Проверьте, что импорт с --workers даёт тот же результат, что '
+            'и в одном процессе.'
+        )
+
+    def test_02_bad_rows_reported(self, data_dir, tmp_path, edit_csv,
+                                  run_import):
+        def break_reviews(rows):
+            rows[0]['score'] = '11'
+            rows[1]['title_id'] = '100500'
+            rows[2]['pub_date'] = 'вчера'
+            rows[3]['text'] = ''
+            return rows
+
+        edit_csv(data_dir / 'review.csv', break_reviews)
+        with open(data_dir / 'review.csv', encoding='utf8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            assert reader.fieldnames
+            lines = []
+            for _ in range(4):
+                lines.append(reader.line_num + 1)
+                next(reader)
+            total = 4 + sum(1 for _ in reader)
+        report = tmp_path / 'rejected.csv'
+        output = run_import(
+            data_dir=data_dir, workers=2, batch_size=2, report=report,
+        )
+        assert f'review.csv: обработано {total - 4}, пропущено 4' in output, (
+            'Проверьте, что строки с ошибками пропускаются, а не прерывают '
+            'импорт.'
+        )
+        assert Review.objects.count() == total - 4
+        with open(report, encoding='utf8', newline='') as csvfile:
+            rejected = list(csv.DictReader(csvfile))
+        assert [
+            (row['file'], int(row['line'])) for row in rejected
+        ] == [('review.csv', line) for line in lines], (
+            'Проверьте, что в отчёте указаны файл и номер строки.'
+        )
+        reasons = [row['reason'] for row in rejected]
+        assert reasons[0].startswith('score:')
+        assert reasons[1] == 'title_id: нет записи с id 100500'
+        assert reasons[2].startswith('pub_date:')
+        assert reasons[3].startswith('text:'), (
+            'Проверьте, что пустая ячейка обязательного текстового поля '
+            'попадает в отчёт.'
+        )
@@ -0,0 +1,125 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.metrics import request_metrics
+from reviews.models import Title
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+def get_metrics(client):
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что `/metrics` доступен администратору, если '
+        'METRICS_TOKEN не задан.'
+    )
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def get_value(metrics, name, **labels):
+    pattern = name + r'\{' + ','.join(
+        f'{key}="{re.escape(value)}"' for key, value in labels.items()
+    ) + r'\} (\S+)'
+    match = re.search(pattern, metrics)
+    assert match, f'Метрика {name} {labels} не найдена.'
+    return float(match.group(1))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Metrics:
+
+    def test_01_route_metrics(self, admin_client):
+        Title.objects.create(name='Произведение', year=2000)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/titles/')
+        queries = len(context.captured_queries)
+        admin_client.get('/api/v1/titles/')
+        metrics = get_metrics(admin_client)
+        route = {'route': 'api:titles-list', 'method': 'GET'}
+        assert get_value(
+            metrics, 'yamdb_http_requests_total', **route, status='2xx',
+        ) == 2, (
+            'Проверьте, что запросы считаются по имени маршрута.'
+        )
+        assert get_value(
+            metrics, 'yamdb_http_request_duration_seconds_count', **route,
+        ) == 2
+        assert get_value(
+            metrics, 'yamdb_http_request_db_queries_bucket',
+            **route, le='+Inf',
+        ) == 2
+        assert get_value(
+            metrics, 'yamdb_http_request_db_queries_sum', **route,
+        ) >= queries > 0, (
+            'Проверьте, что учитываются SQL-запросы маршрута.'
+        )
+        assert get_value(
+            metrics, 'yamdb_http_response_size_bytes_sum', **route,
+        ) == 2 * len(response.content), (
+            'Проверьте, что учитывается размер ответа.'
+        )
+
+    def test_02_labels_are_bounded(self, client, admin_client, settings):
+        settings.METRICS_MAX_ROUTES = 2
+        for url in ('/nowhere/1', '/nowhere/2', '/api/v1/genres/',
+                    '/api/v1/categories/'):
+            client.get(url)
+        metrics = get_metrics(admin_client)
+        assert get_value(
+            metrics, 'yamdb_http_requests_total',
+            route='<unresolved>', method='GET', status='4xx',
+        ) == 2, (
+            'Проверьте, что запросы без маршрута учитываются одной меткой.'
+        )
+        assert 'route="/nowhere' not in metrics
+        assert get_value(
+            metrics, 'yamdb_http_requests_total',
+            route='<other>', method='GET', status='2xx',
+        ) == 1, (
+            'Проверьте, что маршруты сверх METRICS_MAX_ROUTES учитываются '
+            'под меткой <other>.'
+        )
+
+    def test_03_streaming_response(self, admin_client):
+        response = admin_client.get('/api/v1/export/reviews/')
+        content = b''.join(response.streaming_content)
+        metrics = get_metrics(admin_client)
+        assert get_value(
+            metrics, 'yamdb_http_response_size_bytes_sum',
+            route='api:export-reviews', method='GET',
+        ) == len(content), (
+            'Проверьте, что у потоковых ответов учитывается весь размер тела.'
+        )
+
+    def test_04_metrics_token(self, client, settings):
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что с METRICS_TOKEN метрики без токена недоступны.'
+        )
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret',
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_05_metrics_closed_by_default(self, client, user_client,
+                                          settings):
+        for anonymous_or_user in (client, user_client):
+            response = anonymous_or_user.get('/metrics')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что без METRICS_TOKEN метрики доступны только '
+                'администраторам.'
+            )
+        settings.METRICS_PUBLIC = True
+        assert client.get('/metrics').status_code == HTTPStatus.OK, (
+            'Проверьте, что METRICS_PUBLIC открывает метрики всем.'
+        )
@@ -0,0 +1,111 @@
+import json
+import logging
+import re
+
+import pytest
+
+from reviews.models import Genre, Review, Title
+from user.models import OutgoingEmail
+
+
+@pytest.fixture
+def slow_log(caplog, settings):
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    settings.SLOW_REQUEST_SAMPLE_RATE = 1
+    logger = logging.getLogger('api.slow_requests')
+    logger.addHandler(caplog.handler)
+    yield lambda: [json.loads(record.message) for record in caplog.records]
+    logger.removeHandler(caplog.handler)
+
+
+@pytest.fixture
+def titles():
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for idx in range(3):
+        Title.objects.create(name=f'Произведение {idx}', year=2000 + idx)
+    Title.objects.first().genre.add(genre)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SlowRequests:
+
+    def test_01_slow_request_record(self, admin_client, titles, slow_log):
+        admin_client.get('/api/v1/titles/?genre=drama&year=2000')
+        records = slow_log()
+        assert len(records) == 1, (
+            'Проверьте, что запрос дольше SLOW_REQUEST_THRESHOLD '
+            'записывается в лог api.slow_requests.'
+        )
+        record = records[0]
+        assert record['route'] == 'api:titles-list'
+        assert record['params'] == {'genre': 'drama', 'year': '2000'}
+        assert record['status'] == 200
+        assert record['sampled'] is True
+        assert record['query_count'] == len(record['queries']) > 0, (
+            'Проверьте, что в лог попадают SQL-запросы с временем.'
+        )
+        assert all('duration_ms' in query for query in record['queries'])
+        assert 0 < len(record['plans']) <= 3, (
+            'Проверьте, что в лог попадают планы самых медленных запросов.'
+        )
+        assert all(plan['plan'] for plan in record['plans'])
+
+    def test_02_disabled_and_fast_requests(self, client, titles, slow_log,
+                                           settings):
+        settings.SLOW_REQUEST_THRESHOLD = None
+        client.get('/api/v1/titles/')
+        settings.SLOW_REQUEST_THRESHOLD = 60
+        client.get('/api/v1/titles/')
+        assert slow_log() == [], (
+            'Проверьте, что быстрые запросы и запросы с выключенным логом '
+            'не записываются.'
+        )
+        settings.SLOW_QUERY_THRESHOLD = 0
+        client.get('/api/v1/genres/')
+        assert [record['route'] for record in slow_log()] == [
+            'api:genres-list',
+        ], 'Проверьте, что запрос с медленным SQL записывается в лог.'
+
+    def test_03_unsampled_request(self, client, titles, slow_log, settings):
+        settings.SLOW_REQUEST_SAMPLE_RATE = 0
+        client.get('/api/v1/titles/')
+        record, = slow_log()
+        assert record['sampled'] is False
+        assert 'queries' not in record, (
+            'Проверьте, что вне выборки SQL-запросы не собираются.'
+        )
+
+    def test_04_params_not_logged(self, client, caplog, slow_log):
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'new_user', 'email': 'new_user@yamdb.fake',
+        })
+        assert response.status_code == 200
+        code = re.search(
+            r'confirmation_code:(\S+)', OutgoingEmail.objects.get().message,
+        )[1]
+        record, = slow_log()
+        assert record['queries']
+        assert code not in caplog.text, (
+            'Проверьте, что параметры SQL-запросов, например код '
+            'подтверждения, не попадают в лог медленных запросов.'
+        )
+
+    def test_05_streaming_queries(self, admin_client, admin, titles,
+                                  slow_log):
+        Review.objects.create(
+            title=Title.objects.first(), author=admin, text='Отзыв', score=5,
+        )
+        response = admin_client.get('/api/v1/export/reviews/')
+        assert slow_log() == [], (
+            'Проверьте, что потоковый ответ записывается в лог после '
+            'отправки тела.'
+        )
+        b''.join(response.streaming_content)
+        record, = slow_log()
+        assert record['route'] == 'api:export-reviews'
+        assert any(
+            'reviews_review' in query['sql'] for query in record['queries']
+        ), (
+            'Проверьте, что SQL-запросы при отправке потокового ответа '
+            'попадают в лог.'
+        )
@@ -0,0 +1,71 @@
+import pstats
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import list_profiles, parse_profile_name
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, settings):
+    settings.PROFILE_DIR = tmp_path / 'profiles'
+    return settings.PROFILE_DIR
+
+
+def run_profiles(*args, **options):
+    out = StringIO()
+    call_command('profiles', *args, stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Profiling:
+
+    def test_01_admin_header(self, admin_client, user_client, client):
+        user_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert list_profiles() == [], (
+            'Проверьте, что заголовок X-Profile работает только для '
+            'администратора.'
+        )
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        profiles = list_profiles()
+        assert [path.name for path in profiles] == [
+            response['X-Profile-Id']
+        ], (
+            'Проверьте, что профиль сохраняется, а его имя возвращается в '
+            'заголовке X-Profile-Id.'
+        )
+        time, route = parse_profile_name(profiles[0])
+        assert route == 'api:titles-list' and time is not None
+        stats = pstats.Stats(str(profiles[0]))
+        assert any(
+            function == 'list' for _, _, function in stats.stats
+        ), 'Проверьте, что в профиле есть вызов представления.'
+
+    def test_02_sampling_and_limit(self, client, settings):
+        settings.PROFILE_SAMPLE_RATE = 1
+        settings.PROFILE_MAX_FILES = 2
+        for _ in range(3):
+            response = client.get('/api/v1/genres/')
+        assert 'X-Profile-Id' not in response
+        assert len(list_profiles()) == 2, (
+            'Проверьте, что хранятся только PROFILE_MAX_FILES последних '
+            'профилей.'
+        )
+
+    def test_03_command(self, admin_client):
+        assert 'Профилей нет.' in run_profiles()
+        for url in ('/api/v1/titles/', '/api/v1/titles/', '/api/v1/genres/'):
+            admin_client.get(url, HTTP_X_PROFILE='1')
+        output = run_profiles()
+        assert output.count('api:titles-list') == 2
+        assert output.count('api:genres-list') == 1
+        output = run_profiles(route='api:titles-list', limit=5)
+        assert 'Профилей: 2' in output, (
+            'Проверьте, что сводка по маршруту объединяет его профили.'
+        )
+        assert 'cumulative' in output
+        name = list_profiles()[0].name
+        assert 'Профилей: 1' in run_profiles(name, sort='tottime')
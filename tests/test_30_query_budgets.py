@@ -0,0 +1,114 @@
+import logging
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.cache import caches
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+from api.budgets import QueryBudgetExceeded, get_view_budgets
+from api.management.commands.benchmark import Command as Benchmark
+from api.views import TitleViewSet
+
+SKIPPED_METHODS = ('head', 'options')
+
+
+def iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def iter_route_actions():
+    """(представление, действие или метод) всех маршрутов api.views."""
+    for pattern in iter_patterns(get_resolver('api.urls').url_patterns):
+        view_class = getattr(pattern.callback, 'cls', None)
+        if view_class is None or view_class.__module__ != 'api.views':
+            continue
+        actions = getattr(pattern.callback, 'actions', None) or {
+            method: method for method in view_class.http_method_names
+            if hasattr(view_class, method)
+        }
+        for method, action in actions.items():
+            if method not in SKIPPED_METHODS and (
+                method in view_class.http_method_names
+            ):
+                yield view_class, action
+
+
+def get_route_action(method, url):
+    """(представление, действие или метод) маршрута по url запроса."""
+    match = resolve(urlsplit(url).path)
+    actions = getattr(match.func, 'actions', None) or {}
+    return match.func.cls, actions.get(method, method)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30QueryBudgets:
+
+    def test_01_every_route_has_budget(self):
+        missing = sorted({
+            f'{view_class.__name__}.{action}'
+            for view_class, action in iter_route_actions()
+            if action not in get_view_budgets(view_class)
+        })
+        assert not missing, (
+            'Проверьте, что для каждого маршрута API объявлен бюджет '
+            f'SQL-запросов в query_budgets: {", ".join(missing)}.'
+        )
+
+    def test_02_benchmark_covers_every_route(self, budget_dataset):
+        benchmark = Benchmark()
+        benchmark.get_client()
+        covered = {
+            get_route_action(method, url)
+            for _, method, url, _ in benchmark.get_scenarios()
+        }
+        missing = sorted({
+            f'{view_class.__name__}.{action}'
+            for view_class, action in iter_route_actions()
+            if (view_class, action) not in covered
+        })
+        assert not missing, (
+            'Проверьте, что сценарии команды benchmark проходят все '
+            f'маршруты API: {", ".join(missing)}.'
+        )
+
+    def test_03_routes_within_budget(self, budget_dataset, page_size,
+                                     query_budget):
+        benchmark = Benchmark()
+        client = benchmark.get_client()
+        for name, method, url, data in benchmark.get_scenarios():
+            for cache in caches.all():
+                cache.clear()
+            try:
+                benchmark.measure(client, method, url, data)
+            except QueryBudgetExceeded as error:
+                pytest.fail(
+                    f'{name} (страница {page_size}): {error}. Проверьте, '
+                    'что маршрут не выполняет запросов на каждый объект.'
+                )
+
+    def test_04_budget_exceeded(self, client, query_budget, settings,
+                                monkeypatch, caplog):
+        monkeypatch.setattr(TitleViewSet, 'query_budgets', {'list': 0})
+        with pytest.raises(QueryBudgetExceeded, match='api:titles-list'):
+            client.get('/api/v1/titles/')
+        settings.QUERY_BUDGET_ACTION = 'warn'
+        logger = logging.getLogger('api.query_budget')
+        logger.addHandler(caplog.handler)
+        try:
+            response = client.get('/api/v1/titles/?year=1')
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert response.status_code == 200
+        assert 'при бюджете 0' in caplog.text, (
+            'Проверьте, что в режиме warn превышение бюджета записывается '
+            'в лог api.query_budget.'
+        )
+        settings.DEBUG = False
+        settings.QUERY_BUDGET_ACTION = 'raise'
+        assert client.get('/api/v1/titles/?year=2').status_code == 200, (
+            'Проверьте, что бюджеты проверяются только в режиме DEBUG.'
+        )
@@ -0,0 +1,69 @@
+import pytest
+
+from api.views import CommentViewSet, ReviewViewSet
+from reviews.models import Comment, Review, Title
+from tests.utils import check_query_count
+
+AUTHORS_COUNT = 25
+# Произведение, слепок для ETag, COUNT(*) и страница.
+LIST_QUERIES = 4
+
+
+@pytest.fixture
+def discussion(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    authors = [
+        django_user_model.objects.create(
+            username=f'author{idx}',
+            email=f'author{idx}@yamdb.fake',
+            role='moderator' if idx % 5 == 0 else 'user',
+        )
+        for idx in range(AUTHORS_COUNT)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5,
+        )
+        for author in authors
+    ]
+    Comment.objects.bulk_create(
+        Comment(review=reviews[0], author=author, text='Комментарий')
+        for author in authors
+    )
+    reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+    return reviews_url, f'{reviews_url}{reviews[0].id}/comments/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31AuthorExpand:
+
+    @pytest.mark.parametrize('values', (True, False))
+    @pytest.mark.parametrize('query', ('', '?expand=author', '?cursor='))
+    def test_01_list_queries(self, client, discussion, page_size,
+                             monkeypatch, values, query):
+        if not values:
+            for viewset in (ReviewViewSet, CommentViewSet):
+                monkeypatch.setattr(viewset, 'values_serializer_class', None)
+        for url in discussion:
+            response = check_query_count(client, url + query, LIST_QUERIES)
+            assert len(response.json()['results']) == page_size
+
+    def test_02_expanded_author(self, client, discussion,
+                                django_user_model):
+        roles = dict(django_user_model.objects.values_list('username', 'role'))
+        for url in discussion:
+            results = client.get(f'{url}?expand=author').json()['results']
+            assert results, f'Проверьте, что `{url}` возвращает записи.'
+            for result in results:
+                author = result['author']
+                assert isinstance(author, dict) and author == {
+                    'username': author.get('username'),
+                    'role': roles.get(author.get('username')),
+                }, (
+                    f'Проверьте, что `{url}?expand=author` возвращает автора '
+                    'с полями username и role из профиля пользователя.'
+                )
+            plain = client.get(url).json()['results']
+            assert isinstance(plain[0]['author'], str), (
+                'Проверьте, что без expand автор - имя пользователя.'
+            )
@@ -1,5 +1,11 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# SQL-запросы к списку и странице произведения.
+LIST_QUERIES = 3
+DETAIL_QUERIES = 3
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +311,22 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_count(client, url, expected_count):
+    """
+    Выполняет GET-запрос к `url` и проверяет, что на него ушло не больше
+    `expected_count` SQL-запросов.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    assert len(context.captured_queries) <= expected_count, (
+        f'Проверьте, что GET-запрос к `{url}` выполняет не больше '
+        f'{expected_count} SQL-запросов. Сейчас выполнено '
+        f'{len(context.captured_queries)}.'
+    )
+    return response